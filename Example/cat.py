@@ -1,4 +1,5 @@
 from pypurr.all import *
+from pypurr.kinematics import Kinematic2D
 
 
 class Cat(Sprite2D, OnlyOne):
@@ -15,28 +16,21 @@ class Cat(Sprite2D, OnlyOne):
                 Particle()
 
 
-class Particle(Particle2D):
+class Particle(Particle2D, Kinematic2D):
 
     costume = 'cat2.png'
 
     def __init__(self):
         super().__init__()
-        self.vel: mathpr.Vec2 = mathpr.Vec2(pick_random(-10, 10), pick_random(-10, 10))
+        self.vel = Vec2(pick_random(-5, 5), pick_random(-5, 5))
+        self.acc = Vec2(0, -0.5)
         self.rotvel = pick_random(-2, 2)
+        self.kill_plane = -500
 
     def start(self):
         self.pos = mouse_pos()
         self.scale = 1
 
-    def update(self):
-        self.vel += mathpr.Vec2(0, -1)
-
-        self.pos += self.vel * 0.5
-        self.rot += self.rotvel
-
-        if self.y < -500:
-            self.delete()
-
 
 
 
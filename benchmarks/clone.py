@@ -0,0 +1,62 @@
+"""
+Compares creating sprites through their constructor with cloning them from a prototype.
+
+Run from the repository root with `python -m benchmarks.clone`; no display is needed.
+"""
+import argparse
+import time
+
+from . import common
+from pypurr import object, window
+
+
+class BenchSprite(object.Sprite2D):
+
+    costumes = ['cat.png']
+
+
+def construct(n: int) -> float:
+
+    start = time.perf_counter()
+    objs = [BenchSprite() for _ in range(n)]
+    elapsed = time.perf_counter() - start
+
+    for o in objs:
+        o.delete()
+
+    return elapsed
+
+
+def clone(n: int) -> float:
+
+    proto = BenchSprite()
+
+    start = time.perf_counter()
+    objs = proto.spawn_many(n)
+    elapsed = time.perf_counter() - start
+
+    for o in objs + [proto]:
+        o.delete()
+
+    return elapsed
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', type=int, default=10_000, help='objects to create')
+    args = parser.parse_args()
+
+    common.init()
+    window.init()
+
+    object.init_type(BenchSprite)
+
+    for name, f in (('constructor', construct), ('spawn_many', clone)):
+        elapsed = f(args.n)
+        window.cur.on_frame(0)
+        print(f'{name:<12} {elapsed * 1000:>8.1f} ms  {args.n / elapsed:>10.0f} objects/s')
+
+
+if __name__ == '__main__':
+    main()
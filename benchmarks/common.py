@@ -0,0 +1,22 @@
+"""
+Shared setup for running pypurr benchmarks without a display
+"""
+import os
+
+import pyglet as pg
+
+pg.options['headless'] = True
+
+from pypurr import resource
+
+
+RES_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Example', 'res'))
+
+resource.path = [RES_PATH]
+
+
+def init():
+    """
+    Point the resource loader at the example resources
+    """
+    resource.init()
@@ -0,0 +1,66 @@
+"""
+Reports how many bytes of Python heap each engine object takes.
+
+Run from the repository root with `python -m benchmarks.memory`; no display is needed.
+"""
+import argparse
+import gc
+import tracemalloc
+
+from . import common
+from pypurr import object
+from pypurr.kinematics import Kinematic2D
+
+
+class BenchSprite(object.Sprite2D):
+
+    costumes = ['cat.png']
+
+
+class BenchParticle(object.Particle2D):
+
+    costume = 'cat.png'
+
+
+class BenchKinematic(Kinematic2D, object.Particle2D):
+
+    costume = 'cat.png'
+
+
+def bytes_per_object(t: type, n: int) -> float:
+    """
+    Create n objects of type t and return the average number of bytes allocated for each
+    """
+
+    object.init_type(t)
+
+    gc.collect()
+    tracemalloc.start()
+
+    before, _ = tracemalloc.get_traced_memory()
+    objs = [t() for _ in range(n)]
+    after, _ = tracemalloc.get_traced_memory()
+
+    tracemalloc.stop()
+
+    for o in objs:
+        o.delete()
+    object.new_objects.clear()
+
+    return (after - before) / n
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', type=int, default=10_000, help='objects to create per type')
+    args = parser.parse_args()
+
+    common.init()
+
+    for t in (BenchSprite, BenchParticle, BenchKinematic):
+        print(f'{t.__mro__[1].__name__:<12} {bytes_per_object(t, args.n):>10.1f} bytes/object')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+"""
+Runs a small two player game over UDP on localhost, with the host and client in
+separate processes, and reports bandwidth, latency and how closely the client's
+view tracks the host. Beforehand it checks that the client's correction of its
+predicted paddle settles on the host's position.
+
+Run from the repository root with `python -m benchmarks.net_loopback`; no display is needed.
+"""
+import argparse
+import json
+import math as pymath
+import os
+import subprocess
+import sys
+
+from . import common
+import pyglet as pg
+import pypurr
+from pypurr import object, net, pacing, scene, window
+
+
+class Paddle(object.Sprite2D):
+
+    __abstract__ = True
+
+    costumes = ['cat.png']
+    replicated = ('pos',)
+    net_player = 0
+
+    def start(self):
+        self.scale = 0.25
+        self.pos = (-200 if self.net_player == 0 else 200), 0
+
+    def update(self):
+        if net.is_client() and self.net_player != net.local_player:
+            return
+        if net.player_key_down(self.net_player, 'up'):
+            self.y = min(150, self.y + 4)
+        if net.player_key_down(self.net_player, 'down'):
+            self.y = max(-150, self.y - 4)
+
+
+class LeftPaddle(Paddle):
+    net_player = 0
+
+
+class RightPaddle(Paddle):
+    net_player = 1
+
+
+class Ball(object.Sprite2D):
+
+    costumes = ['cat.png']
+    replicated = ('pos', 'rot')
+
+    def start(self):
+        self.scale = 0.1
+        self.vel = [3.0, 2.0]
+
+    def update(self):
+        if net.is_client():
+            return
+        self.x += self.vel[0]
+        self.y += self.vel[1]
+        self.rot += 5
+        if abs(self.x) > 220:
+            self.vel[0] = -self.vel[0]
+        if abs(self.y) > 160:
+            self.vel[1] = -self.vel[1]
+
+
+class Bot(object.GameObject):
+    """
+    Holds the local paddle's keys down in a slow up and down pattern
+    """
+
+    def update(self):
+        up = pymath.sin(pacing.frames_drawn / 30) > 0
+        window.cur.key['up'] = up
+        window.cur.key['down'] = not up
+
+
+class Probe(object.GameObject):
+    """
+    Samples where the right paddle is each frame so the two processes can be compared
+    """
+
+    samples: list[float] = []
+
+    def update(self):
+        for p in object.objects(RightPaddle):
+            self.samples.append(p.y)
+
+
+class Court(scene.Scene):
+
+    def setup(self):
+        if net.is_host():
+            LeftPaddle()
+            RightPaddle()
+            Ball()
+        else:
+            Bot()
+        Probe()
+
+
+class Marker(object.Object2D):
+    pass
+
+
+def check_reconcile() -> bool:
+    """
+    Feed the client three predictions which the host disagrees with by the same amount,
+    and check the predicted object ends up where the host has it
+    """
+
+    o = Marker()
+    net._mirrors[1] = o
+
+    for seq in (1, 2, 3):
+        net._predictions[seq] = {1: (0.0, 0.0)}
+    for seq in (1, 2, 3):
+        net._reconcile(seq, {1: (0, 0, 10 * net.POS_SCALE, 0, 0)})
+
+    net._mirrors.clear()
+    net._predictions.clear()
+    o.delete()
+
+    return abs(o.x) <= net.reconcile_tolerance and abs(o.y - 10) <= net.reconcile_tolerance
+
+
+def run_role(role: str, port: int, seconds: float):
+
+    common.init()
+
+    if role == 'host':
+        net.host_game(port)
+    else:
+        net.join_game('127.0.0.1', port)
+
+    scene.switch_scene(Court())
+
+    def finish(_):
+        stats = net.net_stats()
+        stats['role'] = role
+        stats['paddle_travel'] = sum(abs(b - a) for a, b in zip(Probe.samples, Probe.samples[1:]))
+        stats['paddle_final'] = Probe.samples[-1] if Probe.samples else None
+        print(json.dumps(stats), flush=True)
+        pg.app.event_loop.exit()
+
+    pg.clock.schedule_once(finish, seconds)
+
+    pypurr.run_project()
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--role', choices=('host', 'client'), help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, default=5005)
+    parser.add_argument('-t', type=float, default=3.0, help='seconds to run for')
+    args = parser.parse_args()
+
+    if args.role:
+        run_role(args.role, args.port, args.t)
+        return
+
+    if not check_reconcile():
+        print('Reconciliation does not settle on the host position')
+        sys.exit(1)
+
+    cmd = [sys.executable, '-m', 'benchmarks.net_loopback', '--port', str(args.port)]
+    cwd = os.path.join(os.path.dirname(__file__), '..')
+
+    host = subprocess.Popen(cmd + ['--role', 'host', '-t', str(args.t + 0.5)], cwd=cwd, stdout=subprocess.PIPE, text=True)
+    client = subprocess.Popen(cmd + ['--role', 'client', '-t', str(args.t)], cwd=cwd, stdout=subprocess.PIPE, text=True)
+
+    for p in (client, host):
+        out, _ = p.communicate()
+        stats = json.loads(out.strip().splitlines()[-1])
+        print(f"{stats['role']:<7} sent {stats['bytes_sent_per_frame']:>7.1f} B/frame"
+              f"  received {stats['bytes_received_per_frame']:>7.1f} B/frame"
+              f"  rtt {stats['rtt'] * 1000:>6.2f} ms"
+              f"  entities {stats['entities']}"
+              f"  paddle travel {stats['paddle_travel']:.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,385 @@
+"""
+Measures engine throughput across a set of typical workloads, saving the results as
+JSON so later runs can be compared against them.
+
+Run from the repository root; no display is needed.
+
+    python -m benchmarks.suite run -o baseline.json
+    python -m benchmarks.suite run --compare baseline.json
+    python -m benchmarks.suite compare baseline.json results.json
+
+Each scenario runs in its own process, so peak memory is measured per scenario.
+"""
+import argparse
+import json
+import platform
+import random
+import resource as rusage
+import statistics
+import subprocess
+import sys
+import time
+
+from . import common
+import pyglet as pg
+from pypurr import object, scene, window
+from pypurr.object import proc, wait, wait_message, when_receive, delay, broadcast
+from pypurr.kinematics import Kinematic2D
+
+
+#########################################
+# Objects
+#########################################
+class Spark(Kinematic2D, object.Particle2D):
+
+    costume = 'cat.png'
+
+
+class Sleeper(object.GameObject):
+
+    @proc
+    def start(self):
+        while True:
+            yield wait(1000)
+
+
+class Listener(object.GameObject):
+
+    @proc
+    def start(self):
+        yield wait_message('never')
+
+
+class Receiver(object.GameObject):
+
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+    @when_receive('ping')
+    def on_ping(self):
+        self.count += 1
+        yield delay()
+
+
+class Rock(object.Sprite2D):
+
+    costumes = ['cat.png']
+
+    def update(self):
+        self.x = (self.x + 1) % 400 - 200
+
+
+class Ship(object.Sprite2D):
+
+    costumes = ['cat2.png']
+
+    def __init__(self):
+        super().__init__()
+        self.hits = 0
+
+    def update(self):
+        self.hits = sum(1 for r in object.objects(Rock) if self.touching(r))
+
+
+class Grunt(object.Sprite2D):
+
+    costumes = ['cat.png']
+
+
+class Readout(object.Label2D):
+    pass
+
+
+#########################################
+# Scenarios
+#########################################
+class Scenario(scene.Scene):
+    """
+    A workload which is set up once and then driven for a number of frames
+    """
+
+    name: str
+
+    def frame(self, i: int):
+        """
+        Called before every frame
+        """
+        pass
+
+
+class ParticleBurst(Scenario):
+
+    name = 'particle_burst'
+
+    def frame(self, i):
+        for _ in range(100):
+            s = Spark()
+            s.scale = 5
+            s.vel = random.uniform(-5, 5), random.uniform(0, 5)
+            s.acc = 0, -0.5
+            s.rotvel = random.uniform(-2, 2)
+            s.kill_plane = -300
+
+
+class IdleProcedures(Scenario):
+
+    name = 'idle_procedures'
+
+    def setup(self):
+        for _ in range(3000):
+            Sleeper()
+            Listener()
+
+
+class MassBroadcast(Scenario):
+
+    name = 'mass_broadcast'
+
+    def setup(self):
+        for _ in range(2000):
+            Receiver()
+
+    def frame(self, i):
+        broadcast('ping')
+
+
+class CollisionHeavy(Scenario):
+
+    name = 'collision_heavy'
+
+    def setup(self):
+        for _ in range(200):
+            r = Rock()
+            r.scale = 10
+            r.pos = random.uniform(-200, 200), random.uniform(-150, 150)
+        for _ in range(20):
+            s = Ship()
+            s.scale = 10
+            s.pos = random.uniform(-200, 200), random.uniform(-150, 150)
+
+
+class SpawnKillChurn(Scenario):
+
+    name = 'spawn_kill_churn'
+
+    def setup(self):
+        self.live = [Grunt() for _ in range(2000)]
+
+    def frame(self, i):
+        for g in self.live[:200]:
+            g.delete()
+        self.live = self.live[200:] + [Grunt() for _ in range(200)]
+        for g in self.live[-200:]:
+            g.scale = 5
+            g.pos = random.uniform(-200, 200), random.uniform(-150, 150)
+
+
+class LabelHud(Scenario):
+
+    name = 'label_hud'
+
+    def setup(self):
+        self.labels = [Readout() for _ in range(300)]
+        for k, l in enumerate(self.labels):
+            l.pos = (k % 20) * 20 - 200, (k // 20) * 20 - 150
+
+    def frame(self, i):
+        for l in self.labels:
+            l.text = str(i)
+
+
+scenarios: dict[str, type[Scenario]] = {s.name: s for s in (
+    ParticleBurst, IdleProcedures, MassBroadcast, CollisionHeavy, SpawnKillChurn, LabelHud,
+)}
+
+
+#########################################
+# Measurement
+#########################################
+# Metrics checked by compare, and whether larger values are better
+checked_metrics = {
+    'p50_ms': False,
+    'p95_ms': False,
+    'objects_per_sec': True,
+    'peak_mb': False,
+}
+
+
+def measure(name: str, frames: int, warmup: int, draw: bool) -> dict[str, float]:
+    """
+    Run a single scenario in this process and return its statistics
+    """
+
+    random.seed(0)
+
+    common.init()
+    window.init()
+
+    s = scenarios[name]()
+    scene.switch_scene(s)
+    window.cur.on_frame(0)
+
+    times = []
+    processed = 0
+
+    for i in range(warmup + frames):
+
+        start = time.perf_counter()
+
+        s.frame(i)
+        window.cur.on_frame(0)
+        if draw:
+            window.cur.on_draw()
+            pg.gl.glFinish()
+
+        if i >= warmup:
+            times.append(time.perf_counter() - start)
+            processed += len(object.all_objects)
+
+    q = statistics.quantiles(times, n=100)
+
+    return {
+        'mean_ms': statistics.fmean(times) * 1000,
+        'p50_ms': q[49] * 1000,
+        'p95_ms': q[94] * 1000,
+        'p99_ms': q[98] * 1000,
+        'max_ms': max(times) * 1000,
+        'objects': processed / frames,
+        'objects_per_sec': processed / sum(times),
+        'peak_mb': rusage.getrusage(rusage.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def run(names: list[str], frames: int, warmup: int, draw: bool) -> dict:
+    """
+    Run each of the given scenarios in a fresh process and collect their results
+    """
+
+    results = {}
+
+    for name in names:
+
+        cmd = [sys.executable, '-m', 'benchmarks.suite', 'measure', name,
+               '--frames', str(frames), '--warmup', str(warmup)]
+        if not draw:
+            cmd.append('--no-draw')
+
+        out = subprocess.run(cmd, check=True, stdout=subprocess.PIPE, text=True).stdout
+        results[name] = json.loads(out.strip().splitlines()[-1])
+
+        print_result(name, results[name])
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'pyglet': pg.version,
+            'platform': platform.platform(),
+            'frames': frames,
+            'draw': draw,
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'scenarios': results,
+    }
+
+
+def print_result(name: str, r: dict[str, float]):
+    print(f"{name:<18} p50 {r['p50_ms']:>7.2f} ms  p95 {r['p95_ms']:>7.2f} ms  p99 {r['p99_ms']:>7.2f} ms"
+          f"  {r['objects_per_sec']:>11.0f} obj/s  peak {r['peak_mb']:>6.1f} MB", flush=True)
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """
+    Return a description of every checked metric which got worse by more than the threshold
+    """
+
+    regressions = []
+
+    for name, cur in current['scenarios'].items():
+
+        base = baseline['scenarios'].get(name)
+        if base is None:
+            continue
+
+        for metric, higher_is_better in checked_metrics.items():
+
+            b, c = base[metric], cur[metric]
+            if not b:
+                continue
+
+            change = (c - b) / b
+            worse = -change if higher_is_better else change
+
+            if worse > threshold:
+                regressions.append(f'{name}: {metric} {b:.2f} -> {c:.2f} ({change:+.0%})')
+
+    return regressions
+
+
+def report(baseline: dict, current: dict, threshold: float) -> int:
+
+    for key in ('draw', 'pyglet', 'python'):
+        if baseline['meta'].get(key) != current['meta'].get(key):
+            print(f"warning: baseline has {key}={baseline['meta'].get(key)} but results have {key}={current['meta'].get(key)}")
+
+    regressions = compare(baseline, current, threshold)
+
+    for r in regressions:
+        print('REGRESSION', r)
+    if not regressions:
+        print(f'No regressions beyond {threshold:.0%}')
+
+    return 1 if regressions else 0
+
+
+def main() -> int:
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    p = commands.add_parser('run', help='run scenarios')
+    p.add_argument('scenarios', nargs='*', choices=[[]] + list(scenarios), help='scenarios to run (default: all)')
+    p.add_argument('-o', '--output', help='save results to this JSON file')
+    p.add_argument('--compare', metavar='BASELINE', help='compare results against this JSON file')
+
+    p = commands.add_parser('compare', help='compare two result files')
+    p.add_argument('baseline')
+    p.add_argument('results')
+
+    p = commands.add_parser('measure', help='run one scenario in this process and print its results')
+    p.add_argument('scenario', choices=list(scenarios))
+
+    for p in commands.choices.values():
+        p.add_argument('--frames', type=int, default=300, help='frames to measure per scenario')
+        p.add_argument('--warmup', type=int, default=30, help='frames to run before measuring')
+        p.add_argument('--no-draw', action='store_true', help='skip rendering, measuring only the frame pipeline')
+        p.add_argument('--threshold', type=float, default=0.15, help='relative change counted as a regression')
+
+    args = parser.parse_args()
+
+    if args.command == 'measure':
+        print(json.dumps(measure(args.scenario, args.frames, args.warmup, not args.no_draw)))
+        return 0
+
+    if args.command == 'compare':
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.results) as f:
+            current = json.load(f)
+        return report(baseline, current, args.threshold)
+
+    results = run(args.scenarios or list(scenarios), args.frames, args.warmup, not args.no_draw)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            return report(json.load(f), results, args.threshold)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,7 +6,14 @@ import pyglet as pg
 from . import ping
 from . import object
 from . import window
+from . import pipeline
+from . import pacing
 from . import resource
+from . import audio
+from . import scene
+from . import net
+from . import tasks
+from . import pen
 
 
 def pick_random(start: typing.SupportsFloat, end: typing.SupportsFloat) -> float:
@@ -40,9 +47,14 @@ def fps() -> float:
 _sys_start_time: float
 
 
-def run_project():
+def run_project(*, lazy: bool = False, preload: typing.Iterable[type] = (), target_fps: float = 60):
     """
-    Run the current pypurr app
+    Run the current pypurr app at the given frame rate
+
+    If lazy is set, types are only initialized when they are first created
+    or queried through objects(), and singletons are only created when their
+    instance is first accessed. Types listed in preload are initialized (and
+    created, for singletons) up front regardless.
     """
 
     global _sys_start_time
@@ -52,14 +64,21 @@ def run_project():
     resource.init()
     window.init()
 
-    for k in object.GameObject.initializers:
-        k()
+    object.lazy_types = lazy
 
-    for k in object.all_singleton_types:
-        k.instance = k()
+    if lazy:
+        warm_types = list(preload)
+    else:
+        warm_types = list(object.type_initializers) + list(object.all_singleton_types)
 
-    pg.clock.schedule_interval(window.cur.on_frame, 1 / 60)
+    for k in warm_types:
+        object.init_type(k)
+
+    for k in object.all_singleton_types:
+        if k in warm_types:
+            k()
 
-    pg.app.run()
+    pacing.set_target_fps(target_fps)
+    pacing.run_loop()
 
 
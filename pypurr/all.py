@@ -1,6 +1,13 @@
 from .window import *
 from .input import *
 from .object import *
+from .pipeline import *
+from .pacing import *
+from .audio import *
+from .scene import *
+from .net import *
+from .tasks import *
+from .pen import *
 from .ping import *
 from .math import *
 from . import *
\ No newline at end of file
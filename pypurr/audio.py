@@ -0,0 +1,210 @@
+import dataclasses
+import queue
+import threading
+import time
+import pyglet as pg
+from typing import Optional
+
+from . import resource, pipeline
+
+
+@dataclasses.dataclass
+class SoundOptions:
+    """
+    Playback limits for a single sound effect
+    """
+    max_voices: int = 4
+    cooldown: float = 0.0
+    priority: int = 0
+    volume: float = 1.0
+
+
+class Voice:
+    """
+    One reusable player from the sound effect pool
+    """
+
+    __slots__ = 'player', 'sound', 'priority', 'started', '__weakref__'
+
+    def __init__(self):
+        self.player = pg.media.Player()
+        self.sound: Optional[str] = None
+        self.priority = 0
+        self.started = 0.0
+
+        self.player.push_handlers(on_player_eos=self._on_eos)
+
+    def _on_eos(self):
+        self.sound = None
+
+    def stop(self):
+        if self.sound is not None:
+            self.player.next_source()
+            self.sound = None
+
+
+voice_count: int = 16
+voices: list[Voice] = []
+sound_options: dict[str, SoundOptions] = {}
+_last_played: dict[str, float] = {}
+
+
+def set_voice_count(n: int):
+    """
+    Set how many sound effects can play at once; must be called before the first sound is played
+    """
+    global voice_count
+    assert not voices, "Cannot change the voice count once sounds have been played"
+    voice_count = n
+
+
+def configure_sound(name: str,
+                    max_voices: int = 4,
+                    cooldown: float = 0.0,
+                    priority: int = 0,
+                    volume: float = 1.0):
+    """
+    Set how many copies of a sound may play at once, how long to wait between plays,
+    which sounds it may cut off when every voice is busy, and how loud it is
+    """
+    sound_options[name] = SoundOptions(max_voices, cooldown, priority, volume)
+
+
+def preload_sounds(*names: str):
+    """
+    Decode the given sound effects now, so playing them later does not stall the frame.
+    Sounds loaded while a scene is current are released with it; see also Scene.sounds.
+    """
+
+    for name in names:
+        resource.media(name, streaming=False)
+
+
+def _pick_voice(name: str, options: SoundOptions) -> Optional[Voice]:
+
+    if not voices:
+        voices.extend(Voice() for _ in range(voice_count))
+
+    same = [v for v in voices if v.sound == name]
+    if len(same) >= options.max_voices:
+        return min(same, key=lambda v: v.started)
+
+    for v in voices:
+        if v.sound is None:
+            return v
+
+    stealable = [v for v in voices if v.priority <= options.priority]
+    if not stealable:
+        return None
+
+    return min(stealable, key=lambda v: (v.priority, v.started))
+
+
+def play_sound(name: str, volume: float = 1.0) -> Optional[pg.media.Player]:
+    """
+    Play a short sound effect from the /res folder on a pooled player, returning
+    the player, or None if the sound was skipped. Sounds which were not preloaded
+    are decoded on first play.
+    """
+
+    options = sound_options.get(name) or SoundOptions()
+    now = time.time()
+
+    if name in _last_played and now - _last_played[name] < options.cooldown:
+        return None
+
+    voice = _pick_voice(name, options)
+    if voice is None:
+        return None
+
+    voice.stop()
+
+    voice.sound = name
+    voice.priority = options.priority
+    voice.started = now
+
+    _last_played[name] = now
+
+    voice.player.volume = options.volume * volume
+    voice.player.queue(resource.media(name, streaming=False))
+    voice.player.play()
+
+    return voice.player
+
+
+def stop_sounds():
+    """
+    Stop every sound effect currently playing
+    """
+
+    for v in voices:
+        v.stop()
+
+
+#########################################
+# Music
+#########################################
+music_player: Optional[pg.media.Player] = None
+_music_loads: queue.Queue = queue.Queue()
+_music_request: int = 0
+
+
+def play_music(name: str, loop: bool = True, volume: float = 1.0):
+    """
+    Stream a music file from the /res folder, replacing any music currently playing.
+    The file is opened on a background thread and starts on a later frame.
+    """
+
+    global _music_request
+
+    _music_request += 1
+    request = _music_request
+
+    def load():
+        source = pg.resource.media(name, streaming=True)
+        _music_loads.put((request, source, loop, volume))
+
+    thr = threading.Thread(target=load, name='<Music Loader>')
+    thr.daemon = True
+    thr.start()
+
+
+def stop_music():
+    """
+    Stop the music currently playing
+    """
+
+    global _music_request, music_player
+
+    _music_request += 1
+
+    if music_player is not None:
+        music_player.delete()
+        music_player = None
+
+
+def audio_phase():
+    """
+    Start any music which has finished loading
+    """
+
+    global music_player
+
+    while not _music_loads.empty():
+
+        request, source, loop, volume = _music_loads.get_nowait()
+
+        if request != _music_request:
+            continue
+
+        if music_player is not None:
+            music_player.delete()
+
+        music_player = pg.media.Player()
+        music_player.loop = loop
+        music_player.volume = volume
+        music_player.queue(source)
+        music_player.play()
+
+
+pipeline.add_phase('audio', audio_phase, after='input')
@@ -0,0 +1,349 @@
+import numpy as np
+import pyglet as pg
+from typing import Optional
+
+from . import math, object, pipeline
+
+
+#########################################
+# Body storage
+#########################################
+_capacity: int = 0
+_count: int = 0
+_free: list[int] = []
+_owners: list[Optional['Kinematic2D']] = []
+
+_pos    = np.zeros((0, 2))
+_vel    = np.zeros((0, 2))
+_acc    = np.zeros((0, 2))
+_rot    = np.zeros(0)
+_rotvel = np.zeros(0)
+_drag   = np.zeros(0)
+_min    = np.zeros((0, 2))
+_max    = np.zeros((0, 2))
+_kill_y = np.zeros(0)
+_alive  = np.zeros(0, dtype=bool)
+_linked = np.zeros(0, dtype=bool)
+
+
+def _grow(capacity: int):
+
+    global _capacity, _pos, _vel, _acc, _rot, _rotvel, _drag, _min, _max, _kill_y, _alive, _linked
+
+    def grown(a: np.ndarray, fill) -> np.ndarray:
+        b = np.full((capacity,) + a.shape[1:], fill, dtype=a.dtype)
+        b[:_capacity] = a
+        return b
+
+    _pos    = grown(_pos, 0.0)
+    _vel    = grown(_vel, 0.0)
+    _acc    = grown(_acc, 0.0)
+    _rot    = grown(_rot, 0.0)
+    _rotvel = grown(_rotvel, 0.0)
+    _drag   = grown(_drag, 0.0)
+    _min    = grown(_min, -np.inf)
+    _max    = grown(_max, np.inf)
+    _kill_y = grown(_kill_y, -np.inf)
+    _alive  = grown(_alive, False)
+    _linked = grown(_linked, False)
+
+    _owners.extend([None] * (capacity - _capacity))
+    _capacity = capacity
+
+
+def _alloc_body(owner: 'Kinematic2D') -> int:
+
+    global _count
+
+    if _free:
+        i = _free.pop()
+    else:
+        if _count == _capacity:
+            _grow(max(64, _capacity * 2))
+        i = _count
+        _count += 1
+
+    _owners[i] = owner
+    _alive[i] = True
+
+    # Freed bodies keep their last position, so start new ones at the origin
+    _pos[i] = 0.0
+    _rot[i] = 0.0
+
+    return i
+
+
+def _free_body(i: int):
+
+    _owners[i] = None
+    _alive[i] = False
+    _linked[i] = False
+
+    _vel[i] = _acc[i] = 0.0
+    _rotvel[i] = _drag[i] = 0.0
+    _min[i], _max[i] = -np.inf, np.inf
+    _kill_y[i] = -np.inf
+
+    _free.append(i)
+
+
+class BodyVec2(math.Vec2):
+    """
+    A Vec2 which reads and writes one row of a body array, so changing
+    it in place changes the body
+    """
+
+    __slots__ = '_owner', '_field'
+
+    def __init__(self, owner: 'Kinematic2D', field: str):
+        self._owner = owner
+        self._field = field
+
+    def _row(self) -> np.ndarray:
+        return globals()['_' + self._field][self._owner._index()]
+
+    @property
+    def x(self):
+        return float(self._row()[0])
+    @x.setter
+    def x(self, value):
+        self._row()[0] = value
+        self._owner._vec_changed(self._field)
+
+    @property
+    def y(self):
+        return float(self._row()[1])
+    @y.setter
+    def y(self, value):
+        self._row()[1] = value
+        self._owner._vec_changed(self._field)
+
+
+def step():
+    """
+    Integrate every kinematic body by one frame
+    """
+
+    n = _count
+    if n == len(_free):
+        return
+
+    pos, vel = _pos[:n], _vel[:n]
+
+    vel += _acc[:n]
+    vel *= (1 - _drag[:n])[:, None]
+
+    # Bodies which are all at rest do not need the frame redrawn
+    if vel.any() or _rotvel[:n].any():
+        pipeline.mark_changed()
+
+    pos += vel
+    _rot[:n] += _rotvel[:n]
+
+    lo, hi = _min[:n], _max[:n]
+    outside = (pos < lo) | (pos > hi)
+
+    if outside.any():
+        vel[outside] = 0.0
+        np.clip(pos, lo, hi, out=pos)
+
+    # Bodies with a parent or children keep cached world transforms which are now stale
+    for i in np.flatnonzero(_linked[:n]):
+        _owners[i]._invalidate()
+
+    for i in np.flatnonzero(_alive[:n] & (pos[:, 1] < _kill_y[:n])):
+        _owners[i].delete()
+
+
+pipeline.add_phase('kinematics', step, after='update')
+
+
+#########################################
+# Kinematic objects
+#########################################
+class Kinematic2D(object.Object2D):
+    """
+    Mixin for 2D objects whose position, rotation and motion live in shared
+    arrays which the engine integrates once per frame, after update.
+
+    Velocity and acceleration are in units per frame, angular velocity in degrees per
+    frame, and drag is the fraction of velocity lost each frame.
+
+    pos, vel and acc are views into the arrays, so changing them in place
+    (self.vel.y = 0) changes the body.
+
+    Once removed, an object gives its body back and keeps its final position and
+    rotation as a plain Object2D would; its motion can no longer be read or changed.
+    """
+
+    __abstract__ = True
+
+    # The body index is kept in Object2D's _body slot
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+
+        self._body = _alloc_body(self)
+
+        super().__init__(*args, **kwargs)
+
+    def _release(self):
+        super()._release()
+
+        # The row may be handed to another object, so keep the final placement in Object2D's slots
+        i = self._body
+        self._pos = math.BoundVec2(float(_pos[i, 0]), float(_pos[i, 1]), self, 'pos')
+        self._rot = float(_rot[i])
+        self._body = None
+
+        _free_body(i)
+
+    def _index(self) -> int:
+        """
+        Get this object's row in the body arrays
+        """
+
+        i = self._body
+        if i is None:
+            raise RuntimeError(f'{self.__class__.__name__} has been removed and no longer has a body')
+
+        return i
+
+    def _clone_into(self, clones: list['Kinematic2D']):
+
+        super()._clone_into(clones)
+
+        for c in clones:
+            c._body = _alloc_body(c)
+
+        src, dst = self._index(), [c._body for c in clones]
+        for a in (_pos, _vel, _acc, _rot, _rotvel, _drag, _min, _max, _kill_y):
+            a[dst] = a[src]
+
+        if self._parent is not None:
+            _linked[dst] = True
+
+    def _world_transform(self) -> tuple[float, float, float, float]:
+
+        i = self._body
+        if self._parent is None and i is not None:
+            return float(_pos[i, 0]), float(_pos[i, 1]), float(_rot[i]), self.true_scale
+
+        return super()._world_transform()
+
+    def _vec_changed(self, field: str):
+        if field == 'pos':
+            self._invalidate()
+
+    def _relinked(self):
+        if self._body is not None:
+            _linked[self._body] = self._parent is not None or bool(self._children)
+
+    @property
+    def pos(self):
+        if self._body is None:
+            return self._pos
+        return BodyVec2(self, 'pos')
+    @pos.setter
+    def pos(self, value: math.SupportsVec2):
+        if self._body is None:
+            object.Object2D.pos.fset(self, value)
+            return
+        _pos[self._body] = value[0], value[1]
+        self._invalidate()
+
+    @property
+    def x(self):
+        if self._body is None:
+            return self._pos.x
+        return float(_pos[self._body, 0])
+    @x.setter
+    def x(self, value):
+        if self._body is None:
+            self._pos.x = value
+            return
+        _pos[self._body, 0] = value
+        self._invalidate()
+
+    @property
+    def y(self):
+        if self._body is None:
+            return self._pos.y
+        return float(_pos[self._body, 1])
+    @y.setter
+    def y(self, value):
+        if self._body is None:
+            self._pos.y = value
+            return
+        _pos[self._body, 1] = value
+        self._invalidate()
+
+    @property
+    def rot(self):
+        if self._body is None:
+            return self._rot
+        return float(_rot[self._body])
+    @rot.setter
+    def rot(self, value):
+        if self._body is not None:
+            _rot[self._body] = value
+        else:
+            self._rot = value
+        self._invalidate()
+
+    @property
+    def vel(self):
+        return BodyVec2(self, 'vel')
+    @vel.setter
+    def vel(self, value: math.SupportsVec2):
+        _vel[self._index()] = value[0], value[1]
+
+    @property
+    def acc(self):
+        return BodyVec2(self, 'acc')
+    @acc.setter
+    def acc(self, value: math.SupportsVec2):
+        _acc[self._index()] = value[0], value[1]
+
+    @property
+    def rotvel(self):
+        return float(_rotvel[self._index()])
+    @rotvel.setter
+    def rotvel(self, value):
+        _rotvel[self._index()] = value
+
+    @property
+    def drag(self):
+        return float(_drag[self._index()])
+    @drag.setter
+    def drag(self, value):
+        _drag[self._index()] = value
+
+    @property
+    def bounds(self) -> Optional[math.Rect]:
+        i = self._index()
+        lo, hi = _min[i], _max[i]
+        if np.isinf(lo).all() and np.isinf(hi).all():
+            return None
+        return math.Rect((float(lo[0]), float(lo[1])), (float(hi[0]), float(hi[1])))
+    @bounds.setter
+    def bounds(self, value: Optional[math.Rect]):
+        i = self._index()
+        if value is None:
+            _min[i], _max[i] = -np.inf, np.inf
+        else:
+            _min[i] = value.min.x, value.min.y
+            _max[i] = value.max.x, value.max.y
+
+    @property
+    def kill_plane(self) -> Optional[float]:
+        y = _kill_y[self._index()]
+        return None if np.isneginf(y) else float(y)
+    @kill_plane.setter
+    def kill_plane(self, value: Optional[float]):
+        _kill_y[self._index()] = -np.inf if value is None else value
+
+    def apply_to(self, obj: pg.text.Label | pg.sprite.Sprite):
+
+        # Bodies move without going through the setters, so always re-apply
+        self._place(obj)
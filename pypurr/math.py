@@ -17,6 +17,40 @@ def vec2(v: SupportsVec2) -> Vec2:
     return Vec2(float(v[0]), float(v[1]))
 
 
+_vec_x = Vec2.x
+_vec_y = Vec2.y
+
+
+class BoundVec2(Vec2):
+    """
+    A Vec2 owned by an object, which tells the object whenever it is changed in place
+    """
+
+    __slots__ = '_owner', '_field'
+
+    def __init__(self, x: float, y: float, owner, field: str):
+        _vec_x.__set__(self, x)
+        _vec_y.__set__(self, y)
+        self._owner = owner
+        self._field = field
+
+    @property
+    def x(self):
+        return _vec_x.__get__(self)
+    @x.setter
+    def x(self, value):
+        _vec_x.__set__(self, value)
+        self._owner._vec_changed(self._field)
+
+    @property
+    def y(self):
+        return _vec_y.__get__(self)
+    @y.setter
+    def y(self, value):
+        _vec_y.__set__(self, value)
+        self._owner._vec_changed(self._field)
+
+
 def from_screen(x, y) -> Vec2:
     return Vec2(x - _scr_mod_x, y - _scr_mod_y)
 
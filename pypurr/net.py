@@ -0,0 +1,595 @@
+import collections
+import socket
+import struct
+import time
+from typing import Optional, Type
+
+from . import object, window, pipeline, input
+
+
+#########################################
+# Wire format
+#########################################
+# Positions are sent as 1/8 pixel fixed point, rotations as 1/65536 of a turn
+POS_SCALE = 8
+ROT_SCALE = 65536 / 360
+
+_SNAP_HEADER  = struct.Struct('<cBIIIdH')   # 'S', player, seq, base seq, last input seq, echoed time, entity count
+_INPUT_HEADER = struct.Struct('<cIIdB')     # 'I', input seq, acked snapshot seq, send time, key count
+_ENTITY       = struct.Struct('<HB')        # net id, field flags
+_TYPE         = struct.Struct('<H')
+_POS          = struct.Struct('<hh')
+_ROT          = struct.Struct('<H')
+_IMAGE        = struct.Struct('<B')
+
+F_POS     = 1 << 0
+F_ROT     = 1 << 1
+F_IMAGE   = 1 << 2
+F_NEW     = 1 << 6
+F_REMOVED = 1 << 7
+
+_FIELD_FLAGS = {'pos': F_POS, 'rot': F_ROT, 'image_num': F_IMAGE}
+
+# How many past snapshots are kept to delta against
+HISTORY = 64
+
+# Entity state on the wire: (type index, x, y, rot, image_num), all quantized
+State = dict[int, tuple[int, int, int, int, int]]
+
+
+def _clamp16(v: float) -> int:
+    return max(-32768, min(32767, round(v)))
+
+
+def quantize(o: 'object.Object2D', type_index: int) -> tuple[int, int, int, int, int]:
+    pos = o.pos
+    return (
+        type_index,
+        _clamp16(pos.x * POS_SCALE),
+        _clamp16(pos.y * POS_SCALE),
+        round(o.rot % 360 * ROT_SCALE) % 65536,
+        getattr(o, 'image_num', 0) & 0xFF,
+    )
+
+
+def encode_snapshot(player: int, seq: int, base_seq: int, last_input: int, echo: float,
+                    state: State, base: State, type_flags: list[int]) -> bytes:
+    """
+    Encode the changes from base to state
+    """
+
+    body = []
+    count = 0
+
+    for net_id, cur in state.items():
+
+        prev = base.get(net_id)
+        allowed = type_flags[cur[0]]
+
+        if prev is None or prev[0] != cur[0]:
+            flags = allowed | F_NEW
+        else:
+            flags = allowed & (
+                (F_POS if prev[1:3] != cur[1:3] else 0) |
+                (F_ROT if prev[3] != cur[3] else 0) |
+                (F_IMAGE if prev[4] != cur[4] else 0)
+            )
+            if not flags:
+                continue
+
+        body.append(_ENTITY.pack(net_id, flags))
+        if flags & F_NEW:
+            body.append(_TYPE.pack(cur[0]))
+        if flags & F_POS:
+            body.append(_POS.pack(cur[1], cur[2]))
+        if flags & F_ROT:
+            body.append(_ROT.pack(cur[3]))
+        if flags & F_IMAGE:
+            body.append(_IMAGE.pack(cur[4]))
+
+        count += 1
+
+    for net_id in base:
+        if net_id not in state:
+            body.append(_ENTITY.pack(net_id, F_REMOVED))
+            count += 1
+
+    return _SNAP_HEADER.pack(b'S', player, seq, base_seq, last_input, echo, count) + b''.join(body)
+
+
+def decode_snapshot(data: bytes, base: State) -> tuple[int, int, int, int, float, State]:
+    """
+    Decode a snapshot against its base, returning (player, seq, base seq, last input seq, echoed time, state)
+    """
+
+    _, player, seq, base_seq, last_input, echo, count = _SNAP_HEADER.unpack_from(data)
+    offset = _SNAP_HEADER.size
+
+    state = dict(base)
+
+    for _ in range(count):
+
+        net_id, flags = _ENTITY.unpack_from(data, offset)
+        offset += _ENTITY.size
+
+        if flags & F_REMOVED:
+            state.pop(net_id, None)
+            continue
+
+        if flags & F_NEW:
+            (type_index,) = _TYPE.unpack_from(data, offset)
+            offset += _TYPE.size
+            prev = (type_index, 0, 0, 0, 0)
+        else:
+            prev = state[net_id]
+
+        t, x, y, r, img = prev
+
+        if flags & F_POS:
+            x, y = _POS.unpack_from(data, offset)
+            offset += _POS.size
+        if flags & F_ROT:
+            (r,) = _ROT.unpack_from(data, offset)
+            offset += _ROT.size
+        if flags & F_IMAGE:
+            (img,) = _IMAGE.unpack_from(data, offset)
+            offset += _IMAGE.size
+
+        state[net_id] = t, x, y, r, img
+
+    return player, seq, base_seq, last_input, echo, state
+
+
+#########################################
+# Session state
+#########################################
+role: Optional[str] = None
+local_player: Optional[int] = None
+
+# How far behind the newest snapshot clients render, in seconds
+interp_delay: float = 0.1
+
+# Predicted objects further than this from the host's position, in pixels, are corrected
+reconcile_tolerance: float = 1.0
+
+replicated_types: list[Type['object.GameObject']] = []
+_type_index: dict[type, int] = {}
+_type_flags: list[int] = []
+
+_sock: Optional[socket.socket] = None
+_host_addr: Optional[tuple[str, int]] = None
+
+_bytes_sent: collections.deque = collections.deque(maxlen=60)
+_bytes_received: collections.deque = collections.deque(maxlen=60)
+_rtts: collections.deque = collections.deque(maxlen=60)
+_frame_sent = 0
+_frame_received = 0
+_dropped = 0
+
+
+class Peer:
+    """
+    A client connected to this host
+    """
+
+    def __init__(self, player: int):
+        self.player = player
+        self.keys: frozenset[str] = frozenset()
+        self.last_input = 0
+        self.last_input_time = 0.0
+        self.acked = 0
+
+
+# Host state
+_peers: dict[tuple[str, int], Peer] = {}
+_net_ids: dict['object.GameObject', int] = {}
+_next_net_id = 1
+_snap_seq = 0
+_history: collections.OrderedDict[int, State] = collections.OrderedDict()
+
+# Client state
+_received: collections.OrderedDict[int, State] = collections.OrderedDict()
+_latest_seq = 0
+_buffer: collections.deque = collections.deque(maxlen=32)
+_mirrors: dict[int, 'object.GameObject'] = {}
+_input_seq = 0
+_predictions: collections.OrderedDict[int, dict[int, tuple[float, float]]] = collections.OrderedDict()
+
+
+def _find_replicated_types():
+
+    found = []
+    stack = [object.GameObject]
+
+    while stack:
+        t = stack.pop()
+        stack += t.__subclasses__()
+        if t.__dict__.get('__abstract__') is not True and getattr(t, 'replicated', ()):
+            found.append(t)
+
+    found.sort(key=lambda t: t.__module__ + '.' + t.__qualname__)
+
+    replicated_types[:] = found
+    _type_index.clear()
+    _type_index.update({t: i for i, t in enumerate(found)})
+    _type_flags[:] = [sum(_FIELD_FLAGS[f] for f in t.replicated) for t in found]
+
+
+def _open(bind: tuple[str, int]):
+
+    global _sock
+
+    _find_replicated_types()
+
+    _sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    _sock.bind(bind)
+    _sock.setblocking(False)
+
+
+def host_game(port: int = 5005):
+    """
+    Host a networked game on the given UDP port; replicated objects are simulated here
+    and sent to every client which joins
+    """
+
+    global role, local_player
+
+    role = 'host'
+    local_player = 0
+
+    _open(('', port))
+
+
+def join_game(address: str, port: int = 5005):
+    """
+    Join a game hosted at the given address; replicated objects are mirrored from the host
+    """
+
+    global role, _host_addr
+
+    role = 'client'
+    _host_addr = (socket.gethostbyname(address), port)
+
+    _open(('', 0))
+
+
+def is_host() -> bool:
+    return role == 'host'
+
+
+def is_client() -> bool:
+    return role == 'client'
+
+
+def player_key_down(player: int, key: str) -> bool:
+    """
+    Whether the given player is holding the given key. Player 0 is the host; when not
+    networked every player reads the local keyboard.
+    """
+
+    if role is None or player == local_player:
+        return input.key_down(key)
+
+    if role == 'host':
+        for p in _peers.values():
+            if p.player == player:
+                return key in p.keys
+
+    return False
+
+
+def net_stats() -> dict[str, float]:
+    """
+    Get recent network traffic and latency statistics
+    """
+
+    def mean(d):
+        return sum(d) / len(d) if d else 0.0
+
+    return {
+        'bytes_sent_per_frame': mean(_bytes_sent),
+        'bytes_received_per_frame': mean(_bytes_received),
+        'rtt': mean(_rtts),
+        'peers': len(_peers),
+        'packets_dropped': _dropped,
+        'entities': len(_net_ids) if role == 'host' else len(_mirrors),
+    }
+
+
+def _send(data: bytes, addr: tuple[str, int]):
+
+    global _frame_sent
+
+    try:
+        _sock.sendto(data, addr)
+        _frame_sent += len(data)
+    except (BlockingIOError, ConnectionError):
+        pass
+
+
+#########################################
+# Host
+#########################################
+def _decode_input(data: bytes) -> tuple[int, int, float, frozenset[str]]:
+    """
+    Decode an input packet into (input seq, acked snapshot seq, send time, held keys)
+    """
+
+    _, seq, acked, sent_time, key_count = _INPUT_HEADER.unpack_from(data)
+
+    keys = []
+    offset = _INPUT_HEADER.size
+    for _ in range(key_count):
+        n = data[offset]
+        if offset + 1 + n > len(data):
+            raise IndexError('Input packet truncated')
+        keys.append(data[offset + 1:offset + 1 + n].decode('ascii'))
+        offset += 1 + n
+
+    return seq, acked, sent_time, frozenset(keys)
+
+
+def _host_receive(data: bytes, addr: tuple[str, int]):
+
+    if data[:1] != b'I':
+        return
+
+    seq, acked, sent_time, keys = _decode_input(data)
+
+    if addr not in _peers:
+        _peers[addr] = Peer(len(_peers) + 1)
+
+    peer = _peers[addr]
+
+    if seq <= peer.last_input:
+        return
+
+    peer.keys = keys
+    peer.last_input = seq
+    peer.last_input_time = sent_time
+    peer.acked = max(peer.acked, acked)
+
+
+def _host_sync():
+
+    global _next_net_id, _snap_seq
+
+    state: State = {}
+    seen = {}
+
+    for t, i in _type_index.items():
+        for o in object.objects_by_type.get(t, []):
+
+            if o._dead:
+                continue
+
+            net_id = _net_ids.get(o)
+            if net_id is None:
+                net_id = _next_net_id
+                _next_net_id = _next_net_id % 65535 + 1
+
+            seen[o] = net_id
+            state[net_id] = quantize(o, i)
+
+    _net_ids.clear()
+    _net_ids.update(seen)
+
+    _snap_seq += 1
+    _history[_snap_seq] = state
+    while len(_history) > HISTORY:
+        _history.popitem(last=False)
+
+    for addr, peer in _peers.items():
+
+        base_seq = peer.acked if peer.acked in _history else 0
+        base = _history[base_seq] if base_seq else {}
+
+        _send(encode_snapshot(peer.player, _snap_seq, base_seq, peer.last_input, peer.last_input_time,
+                              state, base, _type_flags), addr)
+
+
+#########################################
+# Client
+#########################################
+def _client_receive(data: bytes):
+
+    global _latest_seq, local_player
+
+    if data[:1] != b'S':
+        return
+
+    _, _, seq, base_seq, _, _, _ = _SNAP_HEADER.unpack_from(data)
+
+    if seq <= _latest_seq:
+        return
+    if base_seq and base_seq not in _received:
+        return
+
+    player, seq, _, last_input, echo, state = decode_snapshot(data, _received[base_seq] if base_seq else {})
+
+    if any(v[0] >= len(replicated_types) for v in state.values()):
+        raise KeyError('Snapshot refers to an unknown replicated type')
+
+    local_player = player
+
+    _latest_seq = seq
+    _received[seq] = state
+    while len(_received) > HISTORY:
+        _received.popitem(last=False)
+
+    if echo:
+        _rtts.append(time.perf_counter() - echo)
+
+    _buffer.append((time.perf_counter(), state))
+
+    _update_mirrors(state)
+    _reconcile(last_input, state)
+
+
+def _update_mirrors(state: State):
+
+    for net_id in [k for k in _mirrors if k not in state]:
+        o = _mirrors.pop(net_id)
+        if not o.__singleton__:
+            o.delete()
+
+    for net_id, (type_index, *_) in state.items():
+
+        if net_id in _mirrors:
+            continue
+
+        t = replicated_types[type_index]
+        _mirrors[net_id] = t.instance if t.__singleton__ else t()
+
+
+def _is_predicted(o: 'object.GameObject') -> bool:
+    return local_player is not None and getattr(o, 'net_player', 0) == local_player
+
+
+def _reconcile(last_input: int, state: State):
+    """
+    Shift predicted objects by however far the host disagreed with the prediction
+    made for the last input it processed
+    """
+
+    predicted = _predictions.get(last_input)
+
+    while _predictions and next(iter(_predictions)) <= last_input:
+        _predictions.popitem(last=False)
+
+    if predicted is None:
+        return
+
+    for net_id, (px, py) in predicted.items():
+
+        if net_id not in state or net_id not in _mirrors:
+            continue
+
+        _, qx, qy, _, _ = state[net_id]
+        dx, dy = qx / POS_SCALE - px, qy / POS_SCALE - py
+
+        if abs(dx) > reconcile_tolerance or abs(dy) > reconcile_tolerance:
+            o = _mirrors[net_id]
+            o.pos = o.pos.x + dx, o.pos.y + dy
+
+            # Later predictions were made from the uncorrected position, so they carry the same error
+            for later in _predictions.values():
+                if net_id in later:
+                    x, y = later[net_id]
+                    later[net_id] = x + dx, y + dy
+
+
+def _lerp_angle(a: float, b: float, f: float) -> float:
+    d = (b - a + 180) % 360 - 180
+    return a + d * f
+
+
+def _client_sync():
+
+    global _input_seq
+
+    # Interpolate remote objects between the two snapshots around the render time
+    if _buffer:
+
+        render_t = time.perf_counter() - interp_delay
+
+        older, newer = _buffer[0], _buffer[-1]
+        for a, b in zip(_buffer, list(_buffer)[1:]):
+            if a[0] <= render_t <= b[0]:
+                older, newer = a, b
+                break
+        else:
+            if render_t > _buffer[-1][0]:
+                older = newer
+
+        span = newer[0] - older[0]
+        f = 0.0 if span <= 0 else min(1.0, max(0.0, (render_t - older[0]) / span))
+
+        for net_id, o in _mirrors.items():
+
+            if o._dead or _is_predicted(o):
+                continue
+
+            b = newer[1].get(net_id)
+            if b is None:
+                continue
+            a = older[1].get(net_id, b)
+
+            fields = o.replicated
+
+            if 'pos' in fields:
+                o.pos = (a[1] + (b[1] - a[1]) * f) / POS_SCALE, (a[2] + (b[2] - a[2]) * f) / POS_SCALE
+            if 'rot' in fields:
+                o.rot = _lerp_angle(a[3] / ROT_SCALE, b[3] / ROT_SCALE, f)
+            if 'image_num' in fields:
+                o.image_num = (a if f < 1 else b)[4]
+
+    # Send this frame's input, remembering where it left predicted objects
+    _input_seq += 1
+
+    _predictions[_input_seq] = {
+        net_id: (o.pos.x, o.pos.y) for net_id, o in _mirrors.items() if _is_predicted(o) and not o._dead
+    }
+    while len(_predictions) > HISTORY:
+        _predictions.popitem(last=False)
+
+    keys = [k.encode('ascii') for k, down in window.cur.key.items() if down][:255]
+
+    _send(_INPUT_HEADER.pack(b'I', _input_seq, _latest_seq, time.perf_counter(), len(keys)) +
+          b''.join(bytes([len(k)]) + k for k in keys), _host_addr)
+
+
+#########################################
+# Frame phases
+#########################################
+def net_receive_phase():
+    """
+    Read every packet which arrived since the last frame
+    """
+
+    global _frame_received, _dropped
+
+    if _sock is None:
+        return
+
+    while True:
+        try:
+            data, addr = _sock.recvfrom(65535)
+        except (BlockingIOError, ConnectionError):
+            break
+
+        _frame_received += len(data)
+
+        # Anything can arrive on the port, so packets which fail to decode are dropped
+        try:
+            if role == 'host':
+                _host_receive(data, addr)
+            else:
+                _client_receive(data)
+        except (struct.error, IndexError, KeyError, UnicodeDecodeError):
+            _dropped += 1
+
+
+def net_sync_phase():
+    """
+    Send snapshots from the host, or apply snapshots and send input on a client
+    """
+
+    global _frame_sent, _frame_received
+
+    if _sock is None:
+        return
+
+    if role == 'host':
+        _host_sync()
+    else:
+        _client_sync()
+        pipeline.mark_changed()
+
+    _bytes_sent.append(_frame_sent)
+    _bytes_received.append(_frame_received)
+    _frame_sent = _frame_received = 0
+
+
+pipeline.add_phase('net_receive', net_receive_phase, after='input')
+pipeline.add_phase('net_sync', net_sync_phase, before='render_prep')
@@ -1,11 +1,13 @@
 import abc
+import copy
 import sys
 import time
 import traceback
+from math import radians as _radians, sin as _sin, cos as _cos
 import pyglet as pg
-from typing import Any, ParamSpec, Callable, Concatenate, Generator, Type, TypeVar, Final, Generic, Union
+from typing import Any, ParamSpec, Callable, Concatenate, Generator, Iterable, Optional, Type, TypeVar, Final, Generic, Union
 
-from . import math, window, resource
+from . import math, window, resource, pipeline, pen
 
 
 class Hooked:
@@ -19,8 +21,10 @@ class HookError(BaseException):
 
 
 all_singleton_types: list[Type['GameObject']] = []
+type_initializers: dict[Type['GameObject'], Callable[[], None]] = {}
 dead_objects: list['GameObject'] = []
 new_objects: list['GameObject'] = []
+busy_objects: dict['GameObject', None] = {}
 
 
 def kill_object(o: 'GameObject'):
@@ -28,6 +32,16 @@ def kill_object(o: 'GameObject'):
 
     objects_by_type[o.__class__].remove(o)
     all_objects.remove(o)
+    busy_objects.pop(o, None)
+
+    for base in o.__class__._index_bases:
+        del objects_by_base[base][o]
+    for tag in o.all_tags:
+        objects_by_tag[tag].pop(o, None)
+
+    _query_cache.clear()
+
+    o._release()
 
 
 def start_object(o: 'GameObject'):
@@ -39,15 +53,115 @@ def start_object(o: 'GameObject'):
     objects_by_type[o.__class__] += [o]
     all_objects += [o]
 
+    for base in o.__class__._index_bases:
+        if base not in objects_by_base:
+            objects_by_base[base] = {}
+        objects_by_base[base][o] = None
+
+    for tag in o.all_tags:
+        if tag not in objects_by_tag:
+            objects_by_tag[tag] = {}
+        objects_by_tag[tag][o] = None
+
+    _query_cache.clear()
+
+
+def kill_objects(doomed: set['GameObject']):
+    """
+    Remove many objects at once, making a single pass over each index instead of one per object
+    """
+
+    global touching_waiters
+
+    if not doomed:
+        return
+
+    all_objects[:] = [o for o in all_objects if o not in doomed]
+    new_objects[:] = [o for o in new_objects if o not in doomed]
+    dead_objects[:] = [o for o in dead_objects if o not in doomed]
+
+    for t in {o.__class__ for o in doomed}:
+        if t in objects_by_type:
+            objects_by_type[t][:] = [o for o in objects_by_type[t] if o not in doomed]
+
+    touching_waiters = [w for w in touching_waiters if w[0] not in doomed]
+
+    for o in doomed:
+
+        busy_objects.pop(o, None)
+
+        for base in o.__class__._index_bases:
+            if base in objects_by_base:
+                objects_by_base[base].pop(o, None)
+        for tag in o.all_tags:
+            if tag in objects_by_tag:
+                objects_by_tag[tag].pop(o, None)
+
+        if o.__class__.__singleton__ and o.__class__.__dict__['instance'] is o:
+            o.__class__.instance = _LazyInstance()
+
+        o._dead = True
+        o._release()
+
+    _query_cache.clear()
+
 
 main_batch = pg.graphics.Batch()
 main_group = pg.graphics.Group()
 
+# The batch and scene which new objects are created in; see pypurr.scene
+active_batch: pg.graphics.Batch = main_batch
+active_scene: Any = None
+
+
+lazy_types: bool = False
+
+
+def init_type(t: Type['GameObject']):
+    """
+    Run the __type_init__ of the given type if it has not been run yet
+    """
+
+    initializer = type_initializers.pop(t, None)
+    if initializer is not None:
+        initializer()
+        if active_scene is not None:
+            active_scene.types.append(t)
+
+
+class _LazyInstance:
+    """
+    Stands in for the instance of a singleton type until it is first
+    accessed, at which point the singleton is created
+    """
+
+    def __get__(self, obj, owner):
+        if not lazy_types:
+            return None
+        return owner()
+
 
 def is_abstract(t):
     return '__abstract__' in t.__dict__ and t.__dict__['__abstract__'] is True
 
 
+def _own_slots(t: type) -> tuple[str, ...]:
+    """
+    Get the attribute names of the slots declared directly on the given type,
+    leaving out those declared by the engine's own types
+    """
+
+    if t.__module__.partition('.')[0] == __name__.partition('.')[0]:
+        return ()
+
+    slots = t.__dict__.get('__slots__', ())
+    if isinstance(slots, str):
+        slots = (slots,)
+
+    return tuple('_' + t.__name__.lstrip('_') + n if n.startswith('__') and not n.endswith('__') else n
+                 for n in slots if n not in ('__dict__', '__weakref__'))
+
+
 class GameObjectMeta(type):
 
     def __new__(mcs, name: str, bases: tuple[type, ...], dct: dict[str, Any]) -> type:
@@ -56,6 +170,10 @@ class GameObjectMeta(type):
 
         new_ty = super().__new__(mcs, name, bases, dct)
 
+        new_ty._index_bases = tuple(b for b in new_ty.__mro__ if isinstance(b, GameObjectMeta))
+        new_ty._class_tags = frozenset(t for b in new_ty.__mro__ for t in b.__dict__.get('tags', ()))
+        new_ty._user_slots = tuple(n for b in new_ty.__mro__ for n in _own_slots(b))
+
         if '__abstract__' in dct and dct['__abstract__'] is True:
             old_init = new_ty.__init__ #type: ignore
             def init(self, *args, **kwargs):
@@ -80,48 +198,191 @@ class GameObjectMeta(type):
 
         if hasattr(new_ty, '__singleton__') and getattr(new_ty, '__singleton__') is True:
             all_singleton_types += [new_ty]
-            new_ty.instance = None
+            new_ty.instance = _LazyInstance()
             new_ty.__annotations__['instance'] = new_ty
 
         if hasattr(new_ty, '__type_init__'):
-            GameObject.initializers += [getattr(new_ty, '__type_init__')]
+            type_initializers[new_ty] = getattr(new_ty, '__type_init__')
 
         return new_ty
 
+    def __call__(cls, *args, **kwargs):
+        if cls in type_initializers:
+            init_type(cls)
+        return super().__call__(*args, **kwargs)
 
-class GameObject(metaclass=GameObjectMeta):
 
-    initializers: list[Callable[[], None]] = []
+class GameObject(metaclass=GameObjectMeta):
 
     __abstract__ = True
     __singleton__ = False
 
+    # Procedure containers are only allocated once an object first runs a procedure
+    __slots__ = '_procedures_to_start', '_active_procedures', '_woken_procedures', '_parked', '_live', '_dead', '_tags', '_scene'
+
+    # Tags shared by every object of this type; see add_tag for per-object tags
+    tags: tuple[str, ...] = ()
+
     def __init__(self):
 
         global new_objects
 
-        self._procedures_to_start: list['Procedure'] = []
-        self._active_procedures: dict['ProcCall', 'ProcedureDelay'] = {}
+        self._procedures_to_start: list['Procedure'] | None = None
+        self._active_procedures: dict['ProcCall', 'ProcedureDelay'] | None = None
+        self._woken_procedures: list[tuple['ProcCall', 'ProcedureDelay']] | None = None
+        self._parked: dict['ProcCall', 'ProcedureDelay'] | None = None
 
-        if self.__class__.__singleton__ and self.__class__ in objects_by_type:
-            raise ValueError(f'Cannot create duplicate instance of singleton class {self.__class__}')
+        if self.__class__.__singleton__:
+            if isinstance(self.__class__.__dict__['instance'], GameObject):
+                raise ValueError(f'Cannot create duplicate instance of singleton class {self.__class__}')
+            self.__class__.instance = self
 
         new_objects += [self]
 
         self._live = False
         self._dead = False
+        self._tags: set[str] | None = None
+        self._scene = active_scene
 
     def delete(self):
         global dead_objects
 
+        if self._dead:
+            return
+
         dead_objects += [self]
         self._dead = True
 
+    @property
+    def all_tags(self) -> frozenset[str]:
+        """
+        All tags of this object, including those declared on its type
+        """
+        if self._tags is None:
+            return self._class_tags
+        return self._class_tags | self._tags
+
+    def _indexed(self) -> bool:
+        """
+        Whether this object is in the object indexes, i.e. start_object has run for it and kill_object has not
+        """
+        return self in objects_by_base.get(GameObject, ())
+
+    def has_tag(self, tag: str) -> bool:
+        return tag in self._class_tags or (self._tags is not None and tag in self._tags)
+
+    def add_tag(self, tag: str):
+        """
+        Give this object a tag which can be queried with objects()
+        """
+
+        if self.has_tag(tag):
+            return
+
+        if self._tags is None:
+            self._tags = set()
+        self._tags.add(tag)
+
+        if self._indexed():
+            if tag not in objects_by_tag:
+                objects_by_tag[tag] = {}
+            objects_by_tag[tag][self] = None
+            _query_cache.clear()
+
+    def remove_tag(self, tag: str):
+        """
+        Remove a tag given with add_tag
+        """
+
+        assert tag not in self._class_tags, f"Cannot remove tag {tag} declared on type {self.__class__.__name__}"
+
+        if self._tags is None or tag not in self._tags:
+            return
+
+        self._tags.remove(tag)
+
+        if self._indexed():
+            objects_by_tag[tag].pop(self, None)
+            _query_cache.clear()
+
+    def _release(self):
+        """
+        Free any engine-owned state once this object has been removed
+        """
+
+        # Procedures still parked on events would otherwise be held until the event fires
+        if self._parked:
+            for p, d in self._parked.items():
+                d.unpark(self, p)
+            self._parked = None
+
+    def clone(self, **overrides):
+        """
+        Create a copy of this object; see spawn_many
+        """
+        return self.spawn_many(1, **overrides)[0]
+
+    def spawn_many(self, n: int, **overrides) -> list:
+        """
+        Create n copies of this object without running their constructors. Engine state
+        is copied from this object, and each instance attribute and keyword is set on every
+        copy with copy.copy, so copies do not share lists or dicts with this object or each
+        other. The copies start on the next frame like any new object.
+        """
+
+        global new_objects
+
+        cls = self.__class__
+        if cls.__singleton__:
+            raise ValueError(f'Cannot clone singleton class {cls}')
+
+        clones = [cls.__new__(cls) for _ in range(n)]
+        self._clone_into(clones)
+
+        for k, v in overrides.items():
+            for c in clones:
+                setattr(c, k, copy.copy(v))
+
+        new_objects += clones
+
+        return clones
+
+    def _clone_into(self, clones: list['GameObject']):
+        """
+        Copy this object's state into freshly allocated, uninitialized objects of the same type
+        """
+
+        attrs = getattr(self, '__dict__', None)
+
+        # Engine-owned slots are set below and by each subclass
+        unset = object()
+        slots = [(n, v) for n in self.__class__._user_slots if (v := getattr(self, n, unset)) is not unset]
+
+        for c in clones:
+
+            if attrs:
+                c.__dict__.update({k: copy.copy(v) for k, v in attrs.items()})
+            for n, v in slots:
+                setattr(c, n, copy.copy(v))
+
+            c._procedures_to_start = None
+            c._active_procedures = None
+            c._woken_procedures = None
+            c._parked = None
+
+            c._live = False
+            c._dead = False
+            c._tags = set(self._tags) if self._tags else None
+            c._scene = active_scene
+
     def run(self, p):
         if not isinstance(p, Procedure):
             p()
         else:
+            if self._procedures_to_start is None:
+                self._procedures_to_start = []
             self._procedures_to_start.append(p)
+            busy_objects[self] = None
 
     def run_hook(self, hook: str):
         if hook not in self.hooks:
@@ -139,83 +400,286 @@ class GameObject(metaclass=GameObjectMeta):
     def update(self):
         pass
 
-    def on_frame(self):
+    def step_procedures(self):
+        """
+        Resume this object's finished procedures and start its new ones
+        """
 
         if self._dead:
             return
 
         if not self._live:
-            self.run(self.start)
-            self._live = True
-        else:
-            self.run(self.update)
+            busy_objects[self] = None
+            return
+
+        active = self._active_procedures
+        finished = None
 
-        to_remove = []
-        started = []
+        if active is None:
+            active = self._active_procedures = {}
+
+        # Resume procedures whose events have fired
+        if self._woken_procedures:
+            for cur_proc, cur_delay in self._woken_procedures:
+                active[cur_proc] = cur_delay
+            self._woken_procedures.clear()
 
         # Run current procedures
-        for cur_proc, cur_delay in self._active_procedures.items():
+        for cur_proc, cur_delay in active.items():
 
-            if cur_delay.is_finished():
-                cur_delay = next(cur_proc)
-                if cur_delay is None or cur_delay is cur_proc:
-                    to_remove.append(cur_proc)
-                else:
-                    cur_delay.mark_used()
+            if not cur_delay.is_finished():
+                continue
+
+            cur_delay = next(cur_proc)
+
+            if cur_delay is not None and cur_delay is not cur_proc:
+                cur_delay.mark_used()
+                if not cur_delay.park(self, cur_proc):
+                    active[cur_proc] = cur_delay
+                    continue
+
+            if finished is None:
+                finished = []
+            finished.append(cur_proc)
+
+        if finished is not None:
+            for p in finished:
+                del active[p]
 
         # Start new procedures
-        for cur_proc_s in self._procedures_to_start:
+        if self._procedures_to_start:
 
-            cur_proc = cur_proc_s.start(self)
-            cur_delay = next(cur_proc)
+            for cur_proc_s in self._procedures_to_start:
 
-            if cur_delay is None:
-                continue
+                cur_proc = cur_proc_s.start(self)
+                cur_delay = next(cur_proc)
 
-            if cur_delay is not cur_proc:
-                self._active_procedures[cur_proc] = cur_delay
-                cur_delay.mark_used()
-                started.append(cur_proc_s)
+                if cur_delay is not None and cur_delay is not cur_proc:
+                    cur_delay.mark_used()
+                    if not cur_delay.park(self, cur_proc):
+                        active[cur_proc] = cur_delay
 
-        # Handle removals
-        for p in to_remove:
-            del self._active_procedures[p]
+            self._procedures_to_start.clear()
 
-        for p in started:
-            self._procedures_to_start.remove(p)
+        if active:
+            busy_objects[self] = None
 
 
 objects_by_type: dict[Type['GameObject'], list['GameObject']] = {}
+objects_by_base: dict[Type['GameObject'], dict['GameObject', None]] = {}
+objects_by_tag: dict[str, dict['GameObject', None]] = {}
 all_objects: list['GameObject'] = []
 
+_query_cache: dict[tuple, list['GameObject']] = {}
+
 
 class OnlyOne(GameObject):
 
     __abstract__ = True
     __singleton__ = True
 
+    __slots__ = ()
+
     instance: 'OnlyOne'
 
 
 class Object2D(GameObject):
+    """
+    A game object with a position, rotation and scale. These are relative to the
+    object's parent, if it has one; the world transform is cached, and only
+    recomputed for objects which moved or whose ancestors moved.
+    """
 
     __abstract__ = True
 
+    # _body is only set by kinematics.Kinematic2D; it is declared here because the mixin
+    # could not add a slot of its own alongside Sprite2D's or Label2D's
+    __slots__ = '_rot', '_pos', '_scale', '_parent', '_children', '_world', '_synced', '_pen', '_body'
+
     def __init__(self):
 
         super().__init__()
 
+        self._parent: Optional['Object2D'] = None
+        self._children: list['Object2D'] | None = None
+
+        # Cached (x, y, rot, scale) in world space, or None if it must be recomputed
+        self._world: tuple[float, float, float, float] | None = None
+        # Whether the last apply_to is still up to date
+        self._synced = False
+
+        self._pen: pen.Pen | None = None
+
         self.rot = 90
 
-        self._pos = math.Vec2()
+        self.pos = 0.0, 0.0
         self.true_scale = 1
 
+    def _invalidate(self):
+        """
+        Mark this object's world transform, and those of all its descendants, as out of date
+        """
+
+        self._world = None
+        self._synced = False
+
+        pipeline.mark_changed()
+
+        if self._children:
+            for c in self._children:
+                if c._world is not None or c._synced:
+                    c._invalidate()
+
+    def _vec_changed(self, field: str):
+        """
+        Called when a vector owned by this object is changed in place
+        """
+        self._invalidate()
+
+    def _relinked(self):
+        """
+        Called whenever this object gains or loses a parent or child
+        """
+        pass
+
+    def _world_transform(self) -> tuple[float, float, float, float]:
+
+        if self._parent is None:
+            pos = self.pos
+            return pos.x, pos.y, self.rot, self.true_scale
+
+        if self._world is None:
+
+            px, py, prot, pscale = self._parent._world_transform()
+            pos = self.pos
+            lx, ly = pos.x * pscale, pos.y * pscale
+
+            a = _radians(prot - 90)
+            c, s = _cos(a), _sin(a)
+
+            self._world = px + lx * c + ly * s, py - lx * s + ly * c, prot + self.rot - 90, pscale * self.true_scale
+
+        return self._world
+
+    @property
+    def parent(self) -> Optional['Object2D']:
+        return self._parent
+    @parent.setter
+    def parent(self, value: Optional['Object2D']):
+        self.set_parent(value)
+
+    @property
+    def children(self) -> tuple['Object2D', ...]:
+        return tuple(self._children or ())
+
+    def set_parent(self, parent: Optional['Object2D'], *, keep_world: bool = False):
+        """
+        Attach this object to the given parent, or detach it if None. Its position, rotation
+        and scale become relative to the parent; if keep_world is set they are converted so
+        that the object stays where it is on screen.
+        """
+
+        if parent is self._parent:
+            return
+
+        p = parent
+        while p is not None:
+            if p is self:
+                raise ValueError('Cannot parent an object to itself or one of its descendants')
+            p = p._parent
+
+        if keep_world:
+            wx, wy, wrot, wscale = self._world_transform()
+
+        old = self._parent
+        if old is not None:
+            old._children.remove(self)
+            old._relinked()
+
+        self._parent = parent
+        if parent is not None:
+            if parent._children is None:
+                parent._children = []
+            parent._children.append(self)
+            parent._relinked()
+
+        self._relinked()
+
+        if keep_world:
+            if parent is None:
+                self.pos, self.rot, self.true_scale = (wx, wy), wrot, wscale
+            else:
+                px, py, prot, pscale = parent._world_transform()
+                dx, dy = (wx - px) / pscale, (wy - py) / pscale
+
+                a = _radians(prot - 90)
+                c, s = _cos(a), _sin(a)
+
+                self.pos = dx * c - dy * s, dx * s + dy * c
+                self.rot = wrot - prot + 90
+                self.true_scale = wscale / pscale
+
+        self._invalidate()
+
+    def delete(self):
+        """
+        Remove this object and all its descendants at the end of the frame
+        """
+
+        super().delete()
+
+        if self._children:
+            for c in self._children:
+                c.delete()
+
+    def _clone_into(self, clones: list['Object2D']):
+        super()._clone_into(clones)
+
+        x, y = self.pos
+        rot, scale = self.rot, self.true_scale
+        parent = self._parent
+
+        for c in clones:
+
+            c._parent = parent
+            c._children = None
+            c._world = None
+            c._synced = False
+            c._pen = None
+
+            c._pos = math.BoundVec2(x, y, c, 'pos')
+            c._rot = rot
+            c._scale = scale
+
+        if parent is not None:
+            parent._children += clones
+            parent._relinked()
+
+    def _release(self):
+        super()._release()
+
+        pen.pens_down.pop(self, None)
+
+        if self._parent is not None:
+            self._parent._children.remove(self)
+            self._parent._relinked()
+            self._parent = None
+
+        if self._children:
+            for c in self._children:
+                c._parent = None
+                c._relinked()
+                c._invalidate()
+            self._children = None
+
     @property
     def pos(self):
         return self._pos
     @pos.setter
     def pos(self, value: math.SupportsVec2):
-        self._pos = math.vec2(value)
+        # Always copy, so the object owns its vector and sees in-place changes to it
+        self._pos = math.BoundVec2(float(value[0]), float(value[1]), self, 'pos')
+        self._invalidate()
 
     @property
     def x(self):
@@ -231,6 +695,22 @@ class Object2D(GameObject):
     def y(self, value):
         self._pos.y = value
 
+    @property
+    def rot(self):
+        return self._rot
+    @rot.setter
+    def rot(self, value):
+        self._rot = value
+        self._invalidate()
+
+    @property
+    def true_scale(self):
+        return self._scale
+    @true_scale.setter
+    def true_scale(self, value):
+        self._scale = value
+        self._invalidate()
+
     @property
     def scale(self):
         return self.true_scale * 100
@@ -238,50 +718,190 @@ class Object2D(GameObject):
     def scale(self, value):
         self.true_scale = value / 100
 
+    @property
+    def world_pos(self) -> math.Vec2:
+        x, y, _, _ = self._world_transform()
+        return math.Vec2(x, y)
+
+    @property
+    def world_rot(self) -> float:
+        return self._world_transform()[2]
+
+    @property
+    def world_scale(self) -> float:
+        return self._world_transform()[3]
+
     def apply_to(self, obj: pg.text.Label | pg.sprite.Sprite):
-        
-        x, y = math.to_screen(self._pos)
+
+        if self._synced:
+            return
+
+        self._place(obj)
+        self._synced = True
+
+    def _place(self, obj: pg.text.Label | pg.sprite.Sprite):
+
+        x, y, rot, scale = self._world_transform()
+        x, y = math.to_screen(math.Vec2(x, y))
 
         obj.x = x
         obj.y = y
 
-        obj.rotation = self.rot + 90
+        obj.rotation = rot + 90
+
+        obj.scale = scale
 
-        obj.scale = self.true_scale
+    #########################################
+    # Pen
+    #########################################
+    def _get_pen(self) -> 'pen.Pen':
+        if self._pen is None:
+            self._pen = pen.Pen()
+        return self._pen
+
+    def pen_down(self):
+        """
+        Start drawing a line behind this object wherever it moves
+        """
+
+        p = self._get_pen()
+        if p.down:
+            return
+
+        x, y, _, _ = self._world_transform()
+
+        p.down = True
+        p.last = x, y
+
+        pen._dot(p, x, y)
+        pen.pens_down[self] = None
+
+    def pen_up(self):
+        """
+        Stop drawing behind this object
+        """
+
+        if self._pen is not None:
+            self._pen.down = False
+            pen.pens_down.pop(self, None)
+
+    @property
+    def pen_is_down(self) -> bool:
+        return self._pen is not None and self._pen.down
+
+    @property
+    def pen_color(self) -> tuple[int, ...]:
+        return self._get_pen().color
+    @pen_color.setter
+    def pen_color(self, value: tuple[int, ...]):
+        self._get_pen().color = tuple(value)
+
+    @property
+    def pen_size(self) -> float:
+        return self._get_pen().size
+    @pen_size.setter
+    def pen_size(self, value: float):
+        self._get_pen().size = value
+
+    def stamp(self):
+        """
+        Draw a copy of this object into the pen layer. Types with nothing to draw
+        cannot be stamped.
+        """
+        raise NotImplementedError(f'Cannot stamp {self.__class__.__name__}: it has nothing to draw')
 
 
 class Label2D(Object2D):
 
+    __slots__ = 'label', 'text'
+
     def __init__(self):
 
         super().__init__()
 
-        self.label = pg.text.Label(batch=main_batch, group=main_group)
+        self.label = pg.text.Label(batch=active_batch, group=main_group)
 
         self.text = ""
 
     def prepare_render(self):
 
-        self.label.text = self.text
+        if self.label.text != self.text:
+            self.label.text = self.text
+            pipeline.mark_changed()
+
         self.apply_to(self.label)
 
+    def _clone_into(self, clones: list['Label2D']):
+        super()._clone_into(clones)
+
+        l = self.label
+        for c in clones:
+            c.text = self.text
+            c.label = pg.text.Label(self.text, font_name=l.font_name, font_size=l.font_size, color=l.color,
+                                    anchor_x=l.anchor_x, anchor_y=l.anchor_y, batch=active_batch, group=main_group)
+
+    def stamp(self):
+        l = self.label
+        stamped = pg.text.Label(self.text, font_name=l.font_name, font_size=l.font_size, color=l.color,
+                                anchor_x=l.anchor_x, anchor_y=l.anchor_y, batch=pen.pen_batch)
+        self._place(stamped)
+        pen._keep(stamped)
+
     def __del__(self):
         self.label.delete()
 
 
+class Clip:
+    """
+    A named sequence of costumes, played at the given frame rate
+    """
+
+    __slots__ = 'frames', 'fps', 'loop', 'ping_pong'
+
+    def __init__(self, frames: list[str], fps: float = 10, *, loop: bool = True, ping_pong: bool = False):
+        self.frames = tuple(frames)
+        self.fps = fps
+        self.loop = loop
+        self.ping_pong = ping_pong
+
+    def resolve(self, img_index: dict[str, int]) -> tuple[int, ...]:
+        """
+        Get the sequence of costume numbers this clip steps through
+        """
+
+        seq = [img_index[f] for f in self.frames]
+
+        if self.ping_pong and len(seq) > 1:
+            seq += seq[-2:0:-1] if self.loop else seq[-2::-1]
+
+        return tuple(seq)
+
+
 class Sprite2D(Object2D):
 
     costumes = ()
+    clips: dict[str, Clip] = {}
 
     image_map: dict[str, pg.image.AbstractImage]
     images: list[pg.image.AbstractImage]
+    img_index: dict[str, int]
+    clip_map: dict[str, tuple[Clip, tuple[int, ...]]]
+
+    __slots__ = 'image_num', 'dir', 'sprite', '_shown_image_num', '_clip_state'
 
     @classmethod
     def __type_init__(cls):
 
-        cls.image_map = {c: resource.image(c) for c in (cls.costumes or [])}
+        names = list(cls.costumes or [])
+        for c in cls.clips.values():
+            names += [f for f in c.frames if f not in names]
+
+        cls.image_map = {c: resource.image(c) for c in names}
         cls.images    = list(cls.image_map.values())
         cls.img_names = list(cls.image_map.keys())
+        cls.img_index = {n: i for i, n in enumerate(cls.img_names)}
+
+        cls.clip_map = {n: (c, c.resolve(cls.img_index)) for n, c in cls.clips.items()}
 
         for i in cls.image_map.values():
             i.anchor_x = i.width  // 2
@@ -293,36 +913,168 @@ class Sprite2D(Object2D):
 
         self.image_num = 0
 
+        self._shown_image_num = 0
+        self._clip_state: tuple[str, Clip, tuple[int, ...], float] | None = None
+
         self.pos = pg.math.Vec2()
         self.dir = 0
         self.scale = 100
 
         group = group or main_group
 
-        self.sprite = pg.sprite.Sprite(self.images[0], batch=main_batch, group=group)
+        self.sprite = pg.sprite.Sprite(self.images[0], batch=active_batch, group=group)
 
 
     def prepare_render(self):
 
-        image: pg.image.AbstractImage = self.images[self.image_num]
-        self.sprite.image = image
+        if self._clip_state is not None:
+            self._step_clip()
+
+        if self.image_num != self._shown_image_num:
+            self.sprite.image = self.images[self.image_num]
+            self._shown_image_num = self.image_num
+            pipeline.mark_changed()
 
         self.apply_to(self.sprite)
 
+    def _clone_into(self, clones: list['Sprite2D']):
+        super()._clone_into(clones)
+
+        for c in clones:
+            c.image_num = self.image_num
+            c.dir = self.dir
+            c._shown_image_num = self._shown_image_num
+            c._clip_state = self._clip_state
+
+        try:
+            sprites = self._copy_sprites(len(clones))
+        except (AttributeError, TypeError):
+            # The fast path relies on pyglet internals; build each sprite normally if they have changed
+            proto = self.sprite
+            sprites = []
+            for _ in clones:
+                sprite = pg.sprite.Sprite(self.images[self._shown_image_num], batch=active_batch, group=proto.group)
+                sprite.color = proto.color
+                sprite.opacity = proto.opacity
+                sprite.visible = proto.visible
+                sprites.append(sprite)
+
+        for c, sprite in zip(clones, sprites):
+            c.sprite = sprite
+
+    # Sprite state which _copy_sprites copies from the prototype. Everything here is
+    # immutable or shared between equal sprites anyway; per-sprite state such as
+    # event handlers and the vertex list is left out.
+    _copied_sprite_state = (
+        '_x', '_y', '_z', '_texture', '_program', '_blend_src', '_blend_dest', '_user_group', '_group',
+        '_subpixel', '_rotation', '_scale', '_scale_x', '_scale_y', '_opacity', '_rgb', '_visible',
+    )
+
+    def _copy_sprites(self, n: int) -> list[pg.sprite.Sprite]:
+        """
+        Make n copies of this object's pyglet sprite, allocating all of their vertices
+        as one block of the batch and giving each sprite its own slice of it.
+        Written against pyglet 2.0's Sprite and IndexedVertexList internals.
+        """
+
+        proto = self.sprite
+        vl = proto._vertex_list
+
+        if proto._animation is not None:
+            raise TypeError('Animated sprites are not copied')
+
+        state = {k: v for k, v in proto.__dict__.items() if k in self._copied_sprite_state}
+
+        block = proto.program.vertex_list_indexed(
+            4 * n, pg.gl.GL_TRIANGLES, [4 * k + i for k in range(n) for i in (0, 1, 2, 0, 2, 3)],
+            active_batch, proto._group,
+            position=('f', tuple(vl.position[:]) * n),
+            colors=('Bn', tuple(vl.colors[:]) * n),
+            translate=('f', tuple(vl.translate[:]) * n),
+            scale=('f', tuple(vl.scale[:]) * n),
+            rotation=('f', tuple(vl.rotation[:]) * n),
+            tex_coords=('f', tuple(vl.tex_coords[:]) * n),
+        )
+
+        try:
+            domain, vl_class = block.domain, block.__class__
+
+            sprites = []
+            for k in range(n):
+                sprite = pg.sprite.Sprite.__new__(pg.sprite.Sprite)
+                sprite.__dict__.update(state)
+                sprite._batch = active_batch
+                sprite._vertex_list = vl_class(domain, block.start + 4 * k, 4, block.index_start + 6 * k, 6)
+                sprites.append(sprite)
+
+        except (AttributeError, TypeError):
+            block.delete()
+            raise
+
+        return sprites
+
+    def stamp(self):
+        stamped = pg.sprite.Sprite(self.images[self.image_num], batch=pen.pen_batch)
+        self._place(stamped)
+        pen._keep(stamped)
+
+    def play(self, name: str, *, restart: bool = False):
+        """
+        Start playing the animation clip with the given name
+        """
+
+        if self._clip_state is not None and self._clip_state[0] == name and not restart:
+            return
+
+        clip, seq = self.clip_map[name]
+        self._clip_state = name, clip, seq, time.time()
+
+        self.image_num = seq[0]
+
+    def stop(self):
+        """
+        Stop playing the current animation clip, leaving the current costume shown
+        """
+
+        self._clip_state = None
+
+    @property
+    def clip(self) -> str | None:
+        """
+        The name of the animation clip currently playing, if any
+        """
+        return self._clip_state[0] if self._clip_state is not None else None
+
+    def _step_clip(self):
+
+        _, clip, seq, start = self._clip_state
+        k = int((time.time() - start) * clip.fps)
+
+        if k >= len(seq):
+            if clip.loop:
+                k %= len(seq)
+            else:
+                k = len(seq) - 1
+                self.stop()
+
+        self.image_num = seq[k]
+
     @property
     def image_name(self) -> str:
         return self.img_names[self.image_num]
     @image_name.setter
     def image_name(self, value: str):
-        self.image_num = self.img_names.index(value)
+        self.image_num = self.img_index[value]
 
     @property
     def rect(self):
+        x, y, _, scale = self._world_transform()
+        pos = math.Vec2(x, y)
         size_vec = math.Vec2(
-            self.true_scale * self.sprite.image.width,
-            self.true_scale * self.sprite.image.height
+            scale * self.sprite.image.width,
+            scale * self.sprite.image.height
         )
-        return math.Rect(self.pos - size_vec / 2, self.pos + size_vec / 2)
+        return math.Rect(pos - size_vec / 2, pos + size_vec / 2)
 
     def touching(self, other: 'SupportsObject') -> bool:
         other = gameobject(other)
@@ -331,7 +1083,7 @@ class Sprite2D(Object2D):
 
     def _pixperf_touching(self, other: 'Sprite2D'):
 
-        selfrect, otherrect = self.rect / self.true_scale, other.rect / other.true_scale
+        selfrect, otherrect = self.rect / self.world_scale, other.rect / other.world_scale
         inter = selfrect @ otherrect
 
         if inter:
@@ -370,6 +1122,8 @@ class Particle2D(Sprite2D):
 
     __abstract__ = True
 
+    __slots__ = ()
+
     costume: str
 
     _group: pg.graphics.TextureGroup
@@ -464,6 +1218,19 @@ class ProcedureDelay(abc.ABC):
     def mark_used(self):
         self._used = True
 
+    def park(self, go: GameObject, p: ProcCall) -> bool:
+        """
+        Take the given procedure off its object's active list until this
+        delay is finished, returning whether it was taken
+        """
+        return False
+
+    def unpark(self, go: GameObject, p: ProcCall):
+        """
+        Forget a procedure parked by this delay because its object has died
+        """
+        pass
+
     @abc.abstractmethod
     def is_finished(self) -> bool: ...
 
@@ -519,6 +1286,139 @@ class WaitUntilImpl(ProcedureDelay):
         return self._f()
 
 
+event_waiters: dict[str, dict[ProcCall, tuple[GameObject, 'WaitEventImpl']]] = {}
+touching_waiters: list[tuple[GameObject, ProcCall, 'WaitTouchingImpl']] = []
+
+
+def fire_event(name: str):
+    """
+    Wake every procedure waiting on the given event
+    """
+
+    waiters = event_waiters.pop(name, None)
+    if waiters is None:
+        return
+
+    for p, (go, d) in waiters.items():
+        d.wake(go, p)
+
+
+def check_touching_waiters():
+    """
+    Wake every procedure whose object has started touching the type it is waiting for
+    """
+
+    global touching_waiters
+
+    if not touching_waiters:
+        return
+
+    waiting = []
+
+    for w in touching_waiters:
+        go, p, d = w
+        if go._dead:
+            continue
+
+        if d.target.__singleton__:
+            targets = [d.target.instance]
+        else:
+            targets = objects_by_type.get(d.target, [])
+
+        if any(go.touching(o) for o in targets if o is not go):
+            d.wake(go, p)
+        else:
+            waiting.append(w)
+
+    touching_waiters = waiting
+
+
+class WaitEventImpl(ProcedureDelay):
+
+    def __init__(self, event: str):
+        super().__init__()
+        self._event = event
+        self._fired = False
+
+    def park(self, go: GameObject, p: ProcCall) -> bool:
+        if self._event not in event_waiters:
+            event_waiters[self._event] = {}
+        event_waiters[self._event][p] = (go, self)
+        self._track(go, p)
+        return True
+
+    def unpark(self, go: GameObject, p: ProcCall):
+        waiters = event_waiters.get(self._event)
+        if waiters is not None:
+            waiters.pop(p, None)
+
+    def _track(self, go: GameObject, p: ProcCall):
+        """
+        Record the parked procedure on its object so it can be unparked if the object dies
+        """
+        if go._parked is None:
+            go._parked = {}
+        go._parked[p] = self
+
+    def wake(self, go: GameObject, p: ProcCall):
+        if go._dead:
+            return
+        if go._parked:
+            go._parked.pop(p, None)
+        self._fired = True
+        if go._woken_procedures is None:
+            go._woken_procedures = []
+        go._woken_procedures.append((p, self))
+        busy_objects[go] = None
+
+    def is_finished(self) -> bool:
+        return self._fired
+
+
+def wait_key(name: str) -> ProcedureDelay:
+    """
+    Return a procedure delay which waits for the given key to be pressed
+    """
+    return WaitEventImpl('key<' + name + '>')
+
+
+def wait_mouse(button: str) -> ProcedureDelay:
+    """
+    Return a procedure delay which waits for the given mouse button to be pressed
+    """
+    return WaitEventImpl('mouse<' + button + '>')
+
+
+def wait_message(name: str) -> ProcedureDelay:
+    """
+    Return a procedure delay which waits for the given message to be broadcast
+    """
+    return WaitEventImpl('receive<' + name + '>')
+
+
+def wait_touching(t: Type['Sprite2D']) -> ProcedureDelay:
+    """
+    Return a procedure delay which waits for the object to touch an object of the given type
+    """
+    return WaitTouchingImpl(t)
+
+
+class WaitTouchingImpl(WaitEventImpl):
+
+    def __init__(self, t: Type['Sprite2D']):
+        super().__init__('touching<' + t.__name__ + '>')
+        self.target = t
+
+    def park(self, go: GameObject, p: ProcCall) -> bool:
+        assert isinstance(go, Sprite2D), "Cannot wait for a non-sprite to touch something"
+        touching_waiters.append((go, p, self))
+        return True
+
+    def unpark(self, go: GameObject, p: ProcCall):
+        # Waiters on dead objects are dropped by the next check_touching_waiters
+        pass
+
+
 ###############################################
 # Hook generators
 ###############################################
@@ -534,13 +1434,41 @@ def when_receive(name: str) -> Callable[[Callable[[GameObject], ProcCall]], Hook
 _T_go = TypeVar('_T_go', bound='GameObject')
 
 
-def objects(t: Type[_T_go]) -> list[_T_go]:
+def objects(t: Optional[Type[_T_go]] = None, *, subclasses: bool = False, tags: Iterable[str] = ()) -> list[_T_go]:
     """
-    Get all objects of a specified non-singleton object type
+    Get all objects of a specified non-singleton object type, optionally including
+    its subclasses and only those with all the given tags. If no type is given,
+    objects of every type are considered.
     """
 
-    assert not t.__singleton__, f"Cannot get instances of singleton type {t.__name__}"
-    return objects_by_type[t] or []
+    if t is not None:
+        assert subclasses or not t.__singleton__, f"Cannot get instances of singleton type {t.__name__}"
+        init_type(t)
+
+    tags = frozenset(tags)
+
+    if t is not None and not subclasses and not tags:
+        return objects_by_type.get(t, [])
+
+    key = t, subclasses, tags
+    if key in _query_cache:
+        return _query_cache[key]
+
+    sources = [objects_by_tag.get(tag, {}) for tag in tags]
+    if t is not None:
+        sources.append(objects_by_base.get(t, {}))
+
+    exact = None if subclasses else t
+
+    if not sources:
+        result = list(all_objects)
+    else:
+        sources.sort(key=len)
+        smallest, rest = sources[0], sources[1:]
+        result = [o for o in smallest if all(o in s for s in rest) and (exact is None or o.__class__ is exact)]
+
+    _query_cache[key] = result
+    return result
 
 
 def broadcast(n: str):
@@ -553,13 +1481,17 @@ def broadcast(n: str):
     for s in all_objects:
         s.run_hook(hook_name)
 
+    fire_event(hook_name)
+
 
 def render():
     """
     Render all the current objects
     """
 
-    for k in all_objects:
-        k.prepare_render()
+    pen.draw_pen_layer()
+
+    if active_batch is not main_batch:
+        active_batch.draw()
 
     main_batch.draw()
\ No newline at end of file
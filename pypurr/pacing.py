@@ -0,0 +1,141 @@
+import collections
+import statistics
+import time
+import pyglet as pg
+
+from . import window, pipeline
+
+
+target_fps: float = 60
+idle_fps: float = 10
+
+# Number of unchanged frames after which the app drops to idle_fps
+idle_after: int = 30
+
+# How long before a frame's deadline to stop sleeping and spin instead
+spin_time: float = 0.002
+
+frames_drawn: int = 0
+frames_skipped: int = 0
+
+_next_frame: float = 0.0
+_last_frame: float = 0.0
+_still_frames: int = 0
+_intervals: collections.deque = collections.deque(maxlen=120)
+
+
+def set_target_fps(fps: float, idle: float | None = None):
+    """
+    Set the frame rate to run at while animating and, optionally, while idle
+    """
+
+    global target_fps, idle_fps
+
+    target_fps = fps
+    if idle is not None:
+        idle_fps = idle
+
+
+def is_idle() -> bool:
+    """
+    Whether the app has dropped to its idle frame rate because nothing is changing
+    """
+    return _still_frames >= idle_after
+
+
+def frame_time() -> float:
+    """
+    The time each frame should currently take, in seconds
+    """
+    return 1 / (idle_fps if is_idle() else target_fps)
+
+
+def pacing_stats() -> dict[str, float]:
+    """
+    Get statistics about recent frame timing
+    """
+
+    if len(_intervals) < 2:
+        mean = jitter = 0.0
+    else:
+        mean = statistics.fmean(_intervals)
+        jitter = statistics.pstdev(_intervals)
+
+    return {
+        'fps': 1 / mean if mean else 0.0,
+        'mean_frame_time': mean,
+        'jitter': jitter,
+        'max_frame_time': max(_intervals, default=0.0),
+        'frames_drawn': frames_drawn,
+        'frames_skipped': frames_skipped,
+        'idle': is_idle(),
+    }
+
+
+class PacedEventLoop(pg.app.EventLoop):
+    """
+    Runs update and draw together once per frame, sleeping until shortly before
+    each frame's deadline and spinning for the rest
+    """
+
+    def idle(self):
+
+        global _next_frame
+
+        now = time.perf_counter()
+
+        # Input wakes the app from idle immediately
+        if window.cur.events and is_idle():
+            _next_frame = now
+
+        remaining = _next_frame - now
+        if remaining > spin_time:
+            return remaining - spin_time
+
+        while time.perf_counter() < _next_frame:
+            pass
+
+        self.frame()
+
+        return max(0.0, _next_frame - time.perf_counter() - spin_time)
+
+    def frame(self):
+
+        global _next_frame, _last_frame, _still_frames, frames_drawn, frames_skipped
+
+        now = time.perf_counter()
+
+        if _last_frame:
+            _intervals.append(now - _last_frame)
+        _last_frame = now
+
+        dt = self.clock.update_time()
+        self.clock.call_scheduled_functions(dt)
+
+        window.cur.on_frame(dt)
+
+        if pipeline.changed or window.cur.exposed:
+            window.cur.exposed = False
+            window.cur.draw(dt)
+            frames_drawn += 1
+            _still_frames = 0
+        else:
+            frames_skipped += 1
+            _still_frames += 1
+
+        _next_frame += frame_time()
+        if _next_frame < now:
+            _next_frame = now + frame_time()
+
+
+def run_loop():
+    """
+    Run the paced main loop until the window is closed
+    """
+
+    global _next_frame
+
+    _next_frame = time.perf_counter()
+
+    pg.app.event_loop = PacedEventLoop()
+    pg.app.event_loop.run(None)
@@ -0,0 +1,149 @@
+import pyglet as pg
+from typing import Any, Optional
+
+from . import window, math, pipeline
+
+
+class Pen:
+    """
+    The pen state of a single object
+    """
+
+    __slots__ = 'color', 'size', 'down', 'last'
+
+    def __init__(self):
+        self.color: tuple[int, ...] = (0, 0, 255, 255)
+        self.size: float = 1
+        self.down = False
+        self.last: Optional[tuple[float, float]] = None
+
+
+# Strokes and stamps added since the layer was last drawn to
+pen_batch = pg.graphics.Batch()
+_pending: list[Any] = []
+
+# Objects whose pens are down, in the order they were put down
+pens_down: dict[Any, None] = {}
+
+_texture: Optional[pg.image.Texture] = None
+_buffer: Optional[pg.image.Framebuffer] = None
+_clear: bool = False
+
+
+def _layer() -> pg.image.Texture:
+
+    global _texture, _buffer
+
+    if _texture is None:
+        w, h = window.window_size
+        _texture = pg.image.Texture.create(w, h)
+        _buffer = pg.image.Framebuffer()
+        _buffer.attach_texture(_texture)
+        _wipe()
+
+    return _texture
+
+
+def _wipe():
+
+    old = (pg.gl.GLfloat * 4)()
+    pg.gl.glGetFloatv(pg.gl.GL_COLOR_CLEAR_VALUE, old)
+
+    _buffer.bind()
+    pg.gl.glClearColor(0, 0, 0, 0)
+    pg.gl.glClear(pg.gl.GL_COLOR_BUFFER_BIT)
+    pg.gl.glClearColor(*old)
+    _buffer.unbind()
+
+
+def _keep(shape: Any):
+    """
+    Hold on to a shape, sprite or label in pen_batch until it has been drawn into the pen layer
+    """
+    _pending.append(shape)
+    pipeline.mark_changed()
+
+
+def _dot(pen: Pen, x: float, y: float):
+    """
+    Draw a single round dot with the given pen
+    """
+    sx, sy = math.to_screen(math.Vec2(x, y))
+    _keep(pg.shapes.Circle(sx, sy, pen.size / 2, color=pen.color, batch=pen_batch))
+
+
+def _line(pen: Pen, x1: float, y1: float, x2: float, y2: float):
+    """
+    Draw a line with round ends with the given pen
+    """
+
+    a = math.to_screen(math.Vec2(x1, y1))
+    b = math.to_screen(math.Vec2(x2, y2))
+
+    _keep(pg.shapes.Line(*a, *b, width=pen.size, color=pen.color, batch=pen_batch))
+
+    if pen.size > 2:
+        _keep(pg.shapes.Circle(*b, pen.size / 2, color=pen.color, batch=pen_batch))
+
+
+def clear_pen():
+    """
+    Erase everything drawn with the pen
+    """
+
+    global _clear
+
+    for s in _pending:
+        s.delete()
+    _pending.clear()
+
+    _clear = True
+    pipeline.mark_changed()
+
+
+def pen_phase():
+    """
+    Add a line for every pen which is down and has moved since the last frame
+    """
+
+    for o in pens_down:
+
+        pen = o._pen
+        x, y, _, _ = o._world_transform()
+
+        if pen.last != (x, y):
+            _line(pen, *pen.last, x, y)
+            pen.last = x, y
+
+
+def draw_pen_layer():
+    """
+    Draw any new strokes into the pen layer, then show the layer
+    """
+
+    global pen_batch, _clear
+
+    if _clear:
+        if _buffer is not None:
+            _wipe()
+        _clear = False
+
+    if _pending:
+
+        _layer()
+
+        _buffer.bind()
+        pen_batch.draw()
+        _buffer.unbind()
+
+        for s in _pending:
+            s.delete()
+        _pending.clear()
+
+        pen_batch = pg.graphics.Batch()
+
+    if _texture is not None:
+        _texture.blit(0, 0)
+
+
+pipeline.add_phase('pen', pen_phase, before='render_prep')
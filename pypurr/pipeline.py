@@ -0,0 +1,226 @@
+from typing import Callable, Optional
+
+from . import object, window
+
+
+class Phase:
+    """
+    A named step of a frame, run once per frame in pipeline order
+    """
+
+    __slots__ = 'name', 'func'
+
+    def __init__(self, name: str, func: Callable[[], None]):
+        self.name = name
+        self.func = func
+
+    def __repr__(self) -> str:
+        return f'Phase({self.name!r})'
+
+
+phases: list[Phase] = []
+
+
+def _phase_index(name: str) -> int:
+    for i, p in enumerate(phases):
+        if p.name == name:
+            return i
+    raise KeyError(f'No frame phase named {name!r}')
+
+
+def add_phase(name: str, f: Callable[[], None], *, before: Optional[str] = None, after: Optional[str] = None):
+    """
+    Register a custom frame phase, by default at the end of the frame
+    """
+
+    if any(p.name == name for p in phases):
+        raise ValueError(f'A frame phase named {name!r} already exists')
+    if before is not None and after is not None:
+        raise ValueError('Cannot place a frame phase both before and after other phases')
+
+    if before is not None:
+        index = _phase_index(before)
+    elif after is not None:
+        index = _phase_index(after) + 1
+    else:
+        index = len(phases)
+
+    phases.insert(index, Phase(name, f))
+
+
+def remove_phase(name: str):
+    """
+    Remove the frame phase with the given name
+    """
+
+    del phases[_phase_index(name)]
+
+
+# Whether anything which could affect rendering happened during the current frame. Objects
+# mark this themselves when they move or change costume or text; updates and procedures
+# which change nothing visible leave it unset.
+changed: bool = False
+
+
+def mark_changed():
+    """
+    Record that the current frame changed something visible, so it must be drawn
+    """
+    global changed
+    changed = True
+
+
+def run_frame():
+    """
+    Run every frame phase in order
+    """
+
+    global changed
+    changed = False
+
+    for p in phases:
+        p.func()
+
+
+_started: list['object.GameObject'] = []
+
+
+def _start_objects(objs: list['object.GameObject']):
+
+    for o in objs:
+
+        if o._dead:
+            continue
+
+        if o.__class__.start is not object.GameObject.start:
+            o.run(o.start)
+
+        o._live = True
+
+
+def input_phase():
+    """
+    Fire the input events received since the last frame
+    """
+
+    events = window.cur.events
+
+    if events:
+        mark_changed()
+        window.cur.events = []
+        for e in events:
+            object.fire_event(e)
+
+
+def start_phase():
+    """
+    Start every object created since the last frame
+    """
+
+    global _started
+
+    _started = object.new_objects
+    object.new_objects = []
+
+    if _started:
+        mark_changed()
+        _start_objects(_started)
+
+
+def update_phase():
+    """
+    Update every live object, skipping types which do not override update
+    """
+
+    for t, objs in object.objects_by_type.items():
+
+        update = t.update
+
+        if update is object.GameObject.update or not objs:
+            continue
+
+        if isinstance(update, object.Procedure):
+            for o in objs:
+                if not o._dead:
+                    o.run(update)
+        else:
+            for o in objs:
+                if not o._dead:
+                    update(o)
+
+    object.check_touching_waiters()
+
+
+def procedure_phase():
+    """
+    Step the procedures of every object which has any
+    """
+
+    stepping = object.busy_objects
+    object.busy_objects = {}
+
+    for o in stepping:
+        o.step_procedures()
+
+
+def spawn_kill_phase():
+    """
+    Register started objects and remove dead ones, starting any objects
+    spawned during the frame so that they act on the frame they were made
+    """
+
+    global _started
+
+    while True:
+
+        for o in _started:
+            object.start_object(o)
+
+        if not object.new_objects:
+            break
+
+        mark_changed()
+
+        _started = object.new_objects
+        object.new_objects = []
+
+        _start_objects(_started)
+
+        for o in _started:
+            if o in object.busy_objects:
+                del object.busy_objects[o]
+                o.step_procedures()
+
+    _started = []
+
+    if object.dead_objects:
+        mark_changed()
+
+    for o in object.dead_objects:
+        object.kill_object(o)
+
+    object.dead_objects = []
+
+
+def render_prep_phase():
+    """
+    Prepare every live object for rendering, skipping types which do not override prepare_render
+    """
+
+    for t, objs in object.objects_by_type.items():
+
+        prepare_render = t.prepare_render
+
+        if prepare_render is object.GameObject.prepare_render:
+            continue
+
+        for o in objs:
+            prepare_render(o)
+
+
+add_phase('input', input_phase)
+add_phase('start', start_phase)
+add_phase('update', update_phase)
+add_phase('procedures', procedure_phase)
+add_phase('spawn_kill', spawn_kill_phase)
+add_phase('render_prep', render_prep_phase)
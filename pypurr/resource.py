@@ -1,11 +1,18 @@
 import dataclasses
 import pyglet as pg
+from typing import Optional
 
 loaded_resources = {}
 
+# Folders searched for resources, relative to the main script
+path: list[str] = ['./res/']
+
+# How many scopes hold each scope-owned resource
+_scope_refs: dict = {}
+
 
 def init():
-    pg.resource.path = ['./res/']
+    pg.resource.path = list(path)
     pg.resource.reindex()
 
 
@@ -32,11 +39,29 @@ def image(name: str,
     options = ImageOptions(name, flip_x, flip_y, rotate, atlas, border)
 
     if options not in loaded_resources:
-        loaded_resources[options] = pg.resource.image(name, flip_x, flip_y, rotate, atlas, border)
+        if scope is None:
+            loaded_resources[options] = pg.resource.image(name, flip_x, flip_y, rotate, atlas, border)
+        else:
+            scope.add_image(options, decode_image(name))
+    elif scope is not None and options in _scope_refs:
+        scope.hold(options)
 
     return loaded_resources[options]
 
 
+def decode_image(name: str) -> pg.image.ImageData:
+    """
+    Read and decode an image from the /res folder without uploading it;
+    this is safe to call off the main thread
+    """
+
+    f = pg.resource.file(name)
+    try:
+        return pg.image.load(name, file=f)
+    finally:
+        f.close()
+
+
 @dataclasses.dataclass(eq=True, frozen=True)
 class MediaOptions:
     name: str
@@ -53,5 +78,98 @@ def media(name: str,
 
     if options not in loaded_resources:
         loaded_resources[options] = pg.resource.media(name, streaming)
+        if scope is not None:
+            scope.hold(options)
+    elif scope is not None and options in _scope_refs:
+        scope.hold(options)
+
+    return loaded_resources[options]
+
+
+def decode_sound(name: str) -> pg.media.StaticSource:
+    """
+    Read and fully decode a sound from the /res folder;
+    this is safe to call off the main thread
+    """
+    return pg.resource.media(name, streaming=False)
+
+
+class ResourceScope:
+    """
+    A group of loaded resources which can be released together. Images loaded
+    into a scope are packed into atlases owned by that scope, so their textures
+    are freed once the scope is released and nothing else refers to them.
+    """
+
+    def __init__(self):
+        self.keys: set = set()
+        self._bin: Optional[pg.image.atlas.TextureBin] = None
+
+    def add_image(self, options: ImageOptions, data: pg.image.ImageData) -> pg.image.AbstractImage:
+        """
+        Upload an already decoded image into this scope
+        """
+
+        if options in loaded_resources:
+            if options in _scope_refs:
+                self.hold(options)
+            return loaded_resources[options]
+
+        max_size = min(2048, pg.image.get_max_texture_size()) - options.border
+
+        if not options.atlas or data.width > max_size or data.height > max_size:
+            img = data.get_texture()
+        else:
+            if self._bin is None:
+                self._bin = pg.image.atlas.TextureBin()
+            img = self._bin.add(data, options.border)
+
+        if options.rotate or options.flip_x or options.flip_y:
+            img = img.get_transform(options.flip_x, options.flip_y, options.rotate)
+
+        loaded_resources[options] = img
+        self.hold(options)
+
+        return img
+
+    def add_media(self, options: MediaOptions, source: pg.media.Source) -> pg.media.Source:
+        """
+        Add an already decoded media source to this scope
+        """
+
+        if options in loaded_resources:
+            if options in _scope_refs:
+                self.hold(options)
+            return loaded_resources[options]
+
+        loaded_resources[options] = source
+        self.hold(options)
+
+        return source
+
+    def hold(self, key):
+        """
+        Keep the given scope-owned resource loaded until this scope is released
+        """
+
+        if key not in self.keys:
+            self.keys.add(key)
+            _scope_refs[key] = _scope_refs.get(key, 0) + 1
+
+    def release(self):
+        """
+        Forget every resource loaded into this scope which no other scope holds
+        """
+
+        for k in self.keys:
+            _scope_refs[k] -= 1
+            if _scope_refs[k] == 0:
+                del _scope_refs[k]
+                loaded_resources.pop(k, None)
+
+        self.keys.clear()
+        self._bin = None
+
 
-    return loaded_resources[options]
\ No newline at end of file
+# The scope newly loaded resources belong to, if any
+scope: Optional[ResourceScope] = None
\ No newline at end of file
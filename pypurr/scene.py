@@ -0,0 +1,190 @@
+import queue
+import threading
+import time
+import pyglet as pg
+from typing import Optional, Type
+
+from . import object, resource, pipeline
+
+
+class Scene:
+    """
+    A level or screen whose objects and resources live and die together.
+
+    Objects created while a scene is current belong to it, and resources and
+    types first loaded while it is current are released when it is torn down.
+    """
+
+    # Types, extra images and sound effects to load in the background by preload_scene
+    preload: tuple[Type[object.GameObject], ...] = ()
+    images: tuple[str, ...] = ()
+    sounds: tuple[str, ...] = ()
+
+    def __init__(self):
+
+        self.batch = pg.graphics.Batch()
+        self.resources = resource.ResourceScope()
+        self.types: list[Type[object.GameObject]] = []
+
+        self.preloaded = False
+        self._decoded: Optional[queue.Queue] = None
+        self._decoding = 0
+
+    def setup(self):
+        """
+        Create the objects which make up this scene
+        """
+        pass
+
+    def teardown(self):
+        """
+        Called just before this scene's objects are removed
+        """
+        pass
+
+
+current: Optional[Scene] = None
+
+# How long each frame may spend uploading preloaded images, in seconds
+preload_budget: float = 0.004
+
+_next_scene: Optional[Scene] = None
+_preloading: list[Scene] = []
+
+
+def current_scene() -> Optional[Scene]:
+    """
+    Get the scene which is currently running, if any
+    """
+    return current
+
+
+def switch_scene(scene: Scene):
+    """
+    Tear down the current scene and set up the given one at the start of the next frame
+    """
+
+    global _next_scene
+    _next_scene = scene
+
+
+def _type_images(t: type) -> list[str]:
+
+    names = list(getattr(t, 'costumes', None) or ())
+    if hasattr(t, 'costume'):
+        names.append(t.costume)
+    for c in getattr(t, 'clips', {}).values():
+        names += c.frames
+
+    return names
+
+
+def preload_scene(scene: Scene):
+    """
+    Start loading the given scene's types, images and sounds in the background. Files
+    are decoded on a worker thread and uploaded a few at a time each frame.
+    """
+
+    if scene._decoded is not None:
+        return
+
+    names = list(dict.fromkeys([n for t in scene.preload for n in _type_images(t)] + list(scene.images)))
+
+    sounds = list(dict.fromkeys(scene.sounds))
+
+    scene._decoded = queue.Queue()
+    scene._decoding = len(names) + len(sounds)
+
+    def decode():
+        for name in names:
+            scene._decoded.put((resource.ImageOptions(name, False, True, 0, True, 1), resource.decode_image(name)))
+        for name in sounds:
+            scene._decoded.put((resource.MediaOptions(name, False), resource.decode_sound(name)))
+
+    thr = threading.Thread(target=decode, name='<Scene Preloader>')
+    thr.daemon = True
+    thr.start()
+
+    _preloading.append(scene)
+
+
+def _upload_preloaded(scene: Scene, deadline: float) -> bool:
+    """
+    Upload decoded images and sounds until the deadline, returning whether the scene has finished preloading
+    """
+
+    while scene._decoding and time.perf_counter() < deadline:
+        try:
+            options, data = scene._decoded.get_nowait()
+        except queue.Empty:
+            return False
+        if isinstance(options, resource.ImageOptions):
+            scene.resources.add_image(options, data)
+        else:
+            scene.resources.add_media(options, data)
+        scene._decoding -= 1
+
+    if scene._decoding:
+        return False
+
+    prev_scope, prev_scene = resource.scope, object.active_scene
+    resource.scope, object.active_scene = scene.resources, scene
+
+    for t in scene.preload:
+        object.init_type(t)
+
+    resource.scope, object.active_scene = prev_scope, prev_scene
+    scene.preloaded = True
+
+    return True
+
+
+def _teardown(scene: Scene):
+
+    scene.teardown()
+
+    object.kill_objects({o for o in object.all_objects + object.new_objects if o._scene is scene})
+
+    for t in scene.types:
+        object.type_initializers[t] = getattr(t, '__type_init__')
+
+    if scene in _preloading:
+        _preloading.remove(scene)
+
+    scene.types.clear()
+    scene.resources.release()
+
+    scene.batch = pg.graphics.Batch()
+    scene.preloaded = False
+    scene._decoded = None
+
+
+def scene_phase():
+    """
+    Switch to the next scene if one was requested, and continue preloading
+    """
+
+    global current, _next_scene
+
+    if _next_scene is not None:
+
+        scene, _next_scene = _next_scene, None
+
+        if current is not None:
+            _teardown(current)
+
+        current = scene
+
+        object.active_scene = scene
+        object.active_batch = scene.batch
+        resource.scope = scene.resources
+
+        pipeline.mark_changed()
+        scene.setup()
+
+    if _preloading:
+        deadline = time.perf_counter() + preload_budget
+        _preloading[:] = [s for s in _preloading if not _upload_preloaded(s, deadline)]
+
+
+pipeline.add_phase('scene', scene_phase, after='input')
@@ -0,0 +1,92 @@
+import asyncio
+import concurrent.futures
+import time
+from typing import Any, Awaitable
+
+from . import object, pipeline
+
+
+# The asyncio event loop which runs for a short slice of every frame
+async_loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+
+# How long each frame may spend running asyncio callbacks, in seconds
+async_time_slice: float = 0.002
+
+# How many batches of ready callbacks each frame may run. A coroutine which awaits
+# something already finished continues in the next batch, so a few are allowed.
+async_passes: int = 4
+
+_in_use: bool = False
+
+
+def spawn_task(aw: Awaitable) -> asyncio.Future:
+    """
+    Start running a coroutine on the game's asyncio loop, without waiting for it
+    """
+
+    global _in_use
+    _in_use = True
+
+    return asyncio.ensure_future(aw, loop=async_loop)
+
+
+def await_task(aw: Awaitable | concurrent.futures.Future) -> 'AwaitTaskImpl':
+    """
+    Return a procedure delay which waits for the given coroutine or future to finish.
+    Coroutines are started on the game's asyncio loop; once finished, the result is
+    available from the delay's result().
+    """
+    return AwaitTaskImpl(aw)
+
+
+class AwaitTaskImpl(object.WaitEventImpl):
+
+    def __init__(self, aw: Awaitable | concurrent.futures.Future):
+
+        super().__init__('task')
+
+        # Tasks made here are cancelled if their object dies before they finish
+        self._owned = asyncio.iscoroutine(aw)
+
+        if isinstance(aw, concurrent.futures.Future):
+            aw = asyncio.wrap_future(aw, loop=async_loop)
+
+        self.task = spawn_task(aw)
+
+    def park(self, go: object.GameObject, p: object.ProcCall) -> bool:
+        self.task.add_done_callback(lambda _: self.wake(go, p))
+        self._track(go, p)
+        return True
+
+    def unpark(self, go: object.GameObject, p: object.ProcCall):
+        if self._owned:
+            self.task.cancel()
+
+    def result(self) -> Any:
+        """
+        Get the result of the awaited task, raising its exception if it failed
+        """
+        return self.task.result()
+
+
+def async_phase():
+    """
+    Run a few batches of ready asyncio callbacks, stopping early if the time slice runs out
+    """
+
+    if not _in_use:
+        return
+
+    deadline = time.perf_counter() + async_time_slice
+
+    for _ in range(async_passes):
+
+        # Each stop-terminated run polls for I/O without blocking and runs one batch of callbacks
+        async_loop.call_soon(async_loop.stop)
+        async_loop.run_forever()
+
+        if time.perf_counter() >= deadline:
+            break
+
+
+pipeline.add_phase('async', async_phase, before='procedures')
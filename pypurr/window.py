@@ -1,6 +1,6 @@
 import pyglet as pg
 
-from . import object, math
+from . import object, math, pipeline
 
 
 cur: 'PypurrWindow'
@@ -33,35 +33,28 @@ class PypurrWindow(pg.window.Window):
         self.mouse = {}
         self.prev_mouse = {}
 
-    def on_frame(self, _):
-
-        cur_objs = object.all_objects + object.new_objects
-
-        while len(cur_objs) > 0:
-
-            for o in cur_objs:
-                o.on_frame()
+        self.events: list[str] = []
+        self.exposed = True
 
-            for o in object.new_objects:
-                object.start_object(o)
-            for o in object.dead_objects:
-                object.kill_object(o)
-
-            cur_objs = object.new_objects
+    def on_frame(self, _):
 
-            object.dead_objects = []
-            object.new_objects = []
+        pipeline.run_frame()
 
         self.prev_key = dict(self.key)
         self.prev_mouse = dict(self.mouse)
 
+    def on_expose(self):
+        self.exposed = True
+
     # noinspection PyMethodOverriding
     def on_draw(self):
         self.clear()
         object.render()
 
     def on_key_press(self, symbol, modifiers):
-        self.key[pg.window.key.symbol_string(symbol).lower()] = True
+        name = pg.window.key.symbol_string(symbol).lower()
+        self.key[name] = True
+        self.events.append('key<' + name + '>')
 
     def on_key_release(self, symbol, modifiers):
         self.key[pg.window.key.symbol_string(symbol).lower()] = False
@@ -70,7 +63,9 @@ class PypurrWindow(pg.window.Window):
         self.mouse_coord = math.from_screen(x, y)
 
     def on_mouse_press(self, x, y, button, modifiers):
-        self.mouse[pg.window.mouse.buttons_string(button).lower()] = True
+        name = pg.window.mouse.buttons_string(button).lower()
+        self.mouse[name] = True
+        self.events.append('mouse<' + name + '>')
 
     def on_mouse_release(self, x, y, button, modifiers):
         self.mouse[pg.window.mouse.buttons_string(button).lower()] = False